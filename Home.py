@@ -1,12 +1,17 @@
 import streamlit as st
-import pandas as pd
-import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-# Import page-rendering functions from modules
-from utils import translate_text, get_translation_cache
-import university_finder
-import assessment
-import about
+import metrics
+from debug_panel import debug_enabled, show_debug_panel
+from utils import translate_text, translate_batch, get_translation_cache
+from session_store import open_session_store, restore_session, save_session
+# Page modules, and the data stack behind them (pandas, pyarrow, the indexes), are
+# imported only when first needed, so the home page does not wait for them
+
+# Start of this rerun, for the per-rerun timer
+rerun_started = time.perf_counter()
 
 # --- AZURE SECRETS (EMBEDDED AS REQUESTED) ---
 # For production, it's highly recommended to use Streamlit's Secrets Management.
@@ -61,21 +66,66 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- DATA LOADING (CACHE AT APP START) ---
-@st.cache_data
-def load_all_data():
+# --- SESSION STORE ---
+# Optional server-side copy of each session's compact state (see session_store.py),
+# so a student keeps their place across restarts and replicas
+@st.cache_resource
+def get_session_store():
+    return open_session_store()
+
+session_store = get_session_store()
+if session_store is not None:
+    restore_session(session_store, st.session_state, st.query_params)
+
+def save_current_session():
+    if session_store is not None:
+        save_session(session_store, st.session_state)
+
+# --- DATA LOADING (IN THE BACKGROUND AT APP START) ---
+# One DataManager per process holds the indexed data and hot-reloads it when the files
+# in data/ change, so updates do not need a restart or a cache clear. It is built in a
+# background thread started by the first run, which renders without waiting for it.
+def _start_data_manager():
+    from data_manager import DataManager
+    with metrics.timed('startup_seconds', stage='data'):
+        manager = DataManager()
+    manager.start_watching()
+    return manager
+
+@st.cache_resource
+def get_data_manager():
+    """Returns a Future for the process's DataManager, starting the load on first call."""
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='data-load')
+    future = executor.submit(_start_data_manager)
+    executor.shutdown(wait=False)  # The thread exits once the load is done
+    return future
+
+data_manager_future = get_data_manager()
+
+def session_data():
+    """
+    Returns the session's DataVersion, waiting for the background load if it is still
+    running. A session keeps the data version it started with until it is back on the
+    home page, so a reload never changes results under a student mid-search or
+    mid-assessment.
+    """
     try:
-        # Switched to 'latin-1' encoding to handle special characters from the CSV file.
-        uni_df = pd.read_csv('data/universities.csv', encoding='latin-1')
-        
-        with open('data/assessment_questions.json', 'r', encoding='utf-8') as f:
-            assessment_data = json.load(f)
-        return uni_df, assessment_data['questions'], assessment_data['career_mapping']
+        if not data_manager_future.done():
+            with st.spinner(T("Loading university data...")):
+                data_manager_future.result()
+        data_manager = data_manager_future.result()
     except Exception as e:
+        # Forget the failed load, so the next run starts a new one instead of re-raising this
+        get_data_manager.clear()
         st.error(f"Failed to load data files: {e}")
-        return pd.DataFrame(), [], {}
-
-uni_df, questions, career_mapping = load_all_data()
+        st.stop()
+    if 'data_version' not in st.session_state:
+        st.session_state.data_version = data_manager.current.number
+    data = data_manager.get(st.session_state.data_version)
+    st.session_state.data_version = data.number
+    if data.error is not None:
+        st.error(f"Failed to load data files: {data.error}")
+    return data
 
 # --- LANGUAGE & TRANSLATION SETUP ---
 lang_code_map = {"English": "en", "Indonesian": "id", "Mandarin": "zh-Hans"}
@@ -97,20 +147,64 @@ def T(text):
         AZURE_TRANSLATOR_REGION
     )
 
+def prefetch_translations(texts):
+    """Fills the translation cache for a whole page in one or two batched API calls."""
+    translate_batch(
+        texts,
+        st.session_state.language_code,
+        translation_cache,
+        AZURE_TRANSLATOR_KEY,
+        AZURE_TRANSLATOR_ENDPOINT,
+        AZURE_TRANSLATOR_REGION
+    )
+
+# Strings used by the header and the home page itself
+HOME_STRINGS = [
+    'Back to Home', 'Language / Bahasa / 语言', 'Gerbang Kampus', 'Your Gateway to Global Education',
+    'University Finder', 'Search and filter top universities worldwide.', 'Explore Universities',
+    'Career Assessment', 'Take our chat-based test to find your path.', 'Start Assessment',
+    'About Us', 'Learn more about the Gerbang Kampus mission.', 'Learn More',
+    'Loading university data...',
+]
+
 # --- NAVIGATION & PAGE ROUTING ---
 if 'page' not in st.session_state:
     st.session_state.page = 'home'
 
 def set_page(page_name):
+    """Navigation button callback; runs before the rerun, so the new page renders straight away."""
     st.session_state.page = page_name
 
+if st.session_state.page == 'home':
+    # Back home, the session moves on to the newest data version when it next needs data
+    st.session_state.pop('data_version', None)
+
+# --- TRANSLATION PREFETCH & LAZY PAGE SETUP ---
+# Only the current page's module is imported and only its data prepared; everything it
+# needs translated is fetched up front, so rendering only hits the cache. The header and
+# loading strings go first, since session_data() may show its spinner before the page's
+# own strings are known.
+prefetch_translations(HOME_STRINGS)
+page_strings = []
+if st.session_state.page == 'finder':
+    import university_finder
+    data = session_data()
+    page_strings = university_finder.page_strings(data.finder_index)
+elif st.session_state.page == 'assessment':
+    import assessment
+    data = session_data()
+    page_strings = assessment.page_strings(data.questions, data.career_mapping)
+elif st.session_state.page == 'about':
+    import about
+    page_strings = about.page_strings()
+prefetch_translations(page_strings)
+
 # --- HEADER & NAVIGATION BAR ---
 header_cols = st.columns([1, 2, 1])
 
 with header_cols[0]:
     if st.session_state.page != 'home':
-        if st.button(f"← {T('Back to Home')}", use_container_width=True):
-            set_page('home')
+        st.button(f"← {T('Back to Home')}", on_click=set_page, args=('home',), use_container_width=True)
 
 with header_cols[2]:
     # Language Selector Widget
@@ -135,28 +229,34 @@ if st.session_state.page == 'home':
             with st.container(border=True, height=200):
                 st.markdown(f"### 🎓 {T('University Finder')}")
                 st.write(T("Search and filter top universities worldwide."))
-                if st.button(T('Explore Universities'), key='nav_finder', use_container_width=True):
-                    set_page('finder')
+                st.button(T('Explore Universities'), key='nav_finder', on_click=set_page, args=('finder',), use_container_width=True)
         
         with col2:
             with st.container(border=True, height=200):
                 st.markdown(f"### 📝 {T('Career Assessment')}")
                 st.write(T("Take our chat-based test to find your path."))
-                if st.button(T('Start Assessment'), key='nav_assessment', use_container_width=True):
-                    set_page('assessment')
+                st.button(T('Start Assessment'), key='nav_assessment', on_click=set_page, args=('assessment',), use_container_width=True)
 
         with col3:
             with st.container(border=True, height=200):
                 st.markdown(f"### ℹ️ {T('About Us')}")
                 st.write(T("Learn more about the Gerbang Kampus mission."))
-                if st.button(T('Learn More'), key='nav_about', use_container_width=True):
-                    set_page('about')
+                st.button(T('Learn More'), key='nav_about', on_click=set_page, args=('about',), use_container_width=True)
 
 elif st.session_state.page == 'finder':
-    university_finder.show_page(T, uni_df)
+    university_finder.show_page(T, data.uni_df, data.finder_index, data.search_index, data.number)
 
 elif st.session_state.page == 'assessment':
-    assessment.show_page(T, questions, career_mapping, uni_df)
+    assessment.show_page(T, data.questions, data.scoring_model, data.recommendation_index, save_current_session)
 
 elif st.session_state.page == 'about':
     about.show_page(T)
+
+save_current_session()
+
+# --- INSTRUMENTATION ---
+metrics.observe('rerun_seconds', time.perf_counter() - rerun_started, page=st.session_state.page)
+if os.environ.get('GERBANG_METRICS_LOG') == '1':
+    metrics.REGISTRY.log_snapshot()
+if debug_enabled():
+    show_debug_panel()
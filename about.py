@@ -1,5 +1,19 @@
 import streamlit as st
 
+def page_strings():
+    """Returns every string the About page passes through T(), for batch prefetching."""
+    return [
+        'About Gerbang Kampus', 'Our Mission', 'Gerbang Kampus', 'Campus Gateway',
+        'is dedicated to simplifying the university and career selection process for students everywhere. We believe that with the right information and self-understanding, every student can find the path that leads to a fulfilling career and a successful future.',
+        'Our Features', 'In-depth University Database',
+        'We provide a curated list of universities with essential information to help you make informed decisions.',
+        'Personalized Career Assessment',
+        'Our assessment tool is designed to align your innate strengths and interests with potential fields of study.',
+        'Intuitive and User-Friendly',
+        'We strive to create a seamless experience, making your search for the perfect university as easy as possible.',
+        'Contact Us', 'For any inquiries or feedback, please feel free to reach out to us at',
+    ]
+
 def show_page(T):
     """
     Renders the About page.
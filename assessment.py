@@ -1,105 +1,138 @@
 import streamlit as st
-from collections import Counter
-import time
 
-def show_page(T, questions, career_mapping, uni_df):
+import metrics
+
+UI_STRINGS = [
+    'Career Assessment', 'Answer the questions as they appear to discover your recommended subjects.',
+    'Hi there! Ready to start your assessment?', 'Strongly Disagree', 'Disagree', 'Neutral', 'Agree',
+    'Strongly Agree', 'Your Top 2 Recommended Subjects',
+    'Your responses did not strongly point to a specific category. Try again to get a recommendation.',
+    'AI University Recommendations',
+    'Based on your results, here are the top-ranked universities for your recommended subjects:',
+    'Top 5 for', 'Rank', 'No specific top universities found in our database for this subject.',
+    'Take Assessment Again',
+]
+
+RESPONSE_OPTIONS = ('Strongly Disagree', 'Disagree', 'Neutral', 'Agree', 'Strongly Agree')
+
+def page_strings(questions, career_mapping):
+    """Returns every string the assessment passes through T(), including questions and subjects."""
+    subjects = {subject for subjects in career_mapping.values() for subject in subjects}
+    return UI_STRINGS + [q['question'] for q in questions] + sorted(subjects)
+
+def _option_labels(T):
     """
-    Renders the chat-based assessment and provides university recommendations.
+    Returns the answer button labels in the current language. T() serves them from the
+    translation store, which only ever holds successful translations, so a failed
+    translation is retried instead of sticking.
     """
-    st.title(f"📝 {T('Career Assessment')}")
-    st.write(T("Answer the questions as they appear to discover your recommended subjects."))
+    return [T(option) for option in RESPONSE_OPTIONS]
+
+def _build_results(T, answers, scoring_model, recommendation_index):
+    """Scores the answers and returns the result and recommendation chat messages."""
+    # Full weighted subject ranking from the compiled scoring model; the top 2 are shown
+    with metrics.timed('assessment_scoring_seconds'):
+        ranked_subjects = scoring_model.rank_subjects([RESPONSE_OPTIONS[answer] for answer in answers])[:2]
 
-    # Initialize session state for the chat
-    if "assessment_step" not in st.session_state:
-        st.session_state.assessment_step = 0
-        st.session_state.assessment_answers = []
-        st.session_state.chat_history = [{"role": "assistant", "content": T("Hi there! Ready to start your assessment?")}]
+    results_text = f"### {T('Your Top 2 Recommended Subjects')}:\n"
+    recommended_subjects = []
+    if ranked_subjects:
+        for subject, score, confidence in ranked_subjects:
+            recommended_subjects.append(subject)
+            results_text += f"- **{T(subject)}** ({confidence:.0%})\n"
+    else:
+        results_text += T("Your responses did not strongly point to a specific category. Try again to get a recommendation.")
+
+    messages = [{"role": "assistant", "content": results_text}]
+
+    # --- AI RECOMMENDATION PART ---
+    if recommended_subjects:
+        reco_text = f"\n---\n\n### {T('AI University Recommendations')}\n"
+        reco_text += f"{T('Based on your results, here are the top-ranked universities for your recommended subjects:')}\n"
+
+        for subject in recommended_subjects:
+            reco_text += f"\n#### {T('Top 5 for')} **{T(subject)}**\n"
+            # Universities that offer exactly this subject, best ranked first
+            top_universities = recommendation_index.top_for_subject(subject, 5)
+            if top_universities:
+                for row in top_universities:
+                    # The university name is now a clickable link
+                    reco_text += f"1. **<a href='{row['Website']}' target='_blank'>{row['University']}</a>** ({T('Rank')}: {row['Rank']})\n"
+            else:
+                reco_text += f"_{T('No specific top universities found in our database for this subject.')}_\n"
+
+        messages.append({"role": "assistant", "content": reco_text})
+    return messages
+
+def _transcript(T, questions, scoring_model, recommendation_index):
+    """
+    Rebuilds the chat from the stored answers: the greeting, each answered question with
+    the answer given, then the next question or, once all are answered, the results.
+    """
+    answers = st.session_state.assessment_answers
+    option_labels = _option_labels(T)
+    messages = [{"role": "assistant", "content": T("Hi there! Ready to start your assessment?")}]
+    for question, answer in zip(questions, answers):
+        messages.append({"role": "assistant", "content": T(question['question'])})
+        messages.append({"role": "user", "content": option_labels[answer]})
+    if len(answers) < len(questions):
+        messages.append({"role": "assistant", "content": T(questions[len(answers)]['question'])})
+    elif answers:
+        messages.extend(_build_results(T, answers, scoring_model, recommendation_index))
+    return messages
+
+def _record_answer(option_index):
+    """Answer button callback. Runs before the rerun the click triggers, so the answer is in when the chat is drawn."""
+    st.session_state.assessment_answers.append(option_index)
+
+def _reset_assessment():
+    """'Take Assessment Again' callback: clears the answers so the assessment starts over."""
+    st.session_state.assessment_answers = bytearray()
+
+@st.fragment
+def _chat(T, questions, scoring_model, recommendation_index, save_session=None):
+    """
+    The chat itself. As a fragment, clicking an answer reruns only this function rather
+    than the whole app. The session keeps only the answers, one byte per question (the
+    RESPONSE_OPTIONS index); the transcript is rebuilt from them on every draw, with its
+    translations served from the translation cache.
+    """
+    if "assessment_answers" not in st.session_state or len(st.session_state.assessment_answers) > len(questions):
+        st.session_state.assessment_answers = bytearray()
+    step = len(st.session_state.assessment_answers)
 
-    # --- CHANGE APPLIED HERE ---
     # Display chat history with custom icons
-    for message in st.session_state.chat_history:
+    for message in _transcript(T, questions, scoring_model, recommendation_index):
         # Assign a unique avatar for the assistant and the user
         avatar_icon = "🤖" if message["role"] == "assistant" else "🗣️"
         with st.chat_message(message["role"], avatar=avatar_icon):
             st.markdown(message["content"], unsafe_allow_html=True)
 
     # Main chat logic
-    if st.session_state.assessment_step < len(questions):
-        current_q = questions[st.session_state.assessment_step]
-        q_text = T(current_q['question'])
-
-        if not st.session_state.chat_history or st.session_state.chat_history[-1]["content"] != q_text:
-            st.session_state.chat_history.append({"role": "assistant", "content": q_text})
-            st.rerun()
-
-        response_options_english = ('Strongly Disagree', 'Disagree', 'Neutral', 'Agree', 'Strongly Agree')
-        response_options_translated = [T(opt) for opt in response_options_english]
-        
-        cols = st.columns(len(response_options_translated))
-        for i, option_translated in enumerate(response_options_translated):
-            if cols[i].button(option_translated, use_container_width=True, key=f"q_{st.session_state.assessment_step}_{i}"):
-                st.session_state.chat_history.append({"role": "user", "content": option_translated})
-                st.session_state.assessment_answers.append({
-                    "category": current_q['category'],
-                    "answer": response_options_english[i]
-                })
-                st.session_state.assessment_step += 1
-                st.rerun()
-
+    if step < len(questions):
+        option_labels = _option_labels(T)
+        cols = st.columns(len(option_labels))
+        for i, option_translated in enumerate(option_labels):
+            cols[i].button(
+                option_translated,
+                use_container_width=True,
+                key=f"q_{step}_{i}",
+                on_click=_record_answer,
+                args=(i,),
+            )
     else: # Assessment is finished
-        if "results_calculated" not in st.session_state:
-            with st.spinner(T("Analyzing your answers...")):
-                time.sleep(1)
-                scores = {category: 0 for category in career_mapping.keys()}
-                value_map = {'Strongly Disagree': -2, 'Disagree': -1, 'Neutral': 0, 'Agree': 1, 'Strongly Agree': 2}
-
-                for ans in st.session_state.assessment_answers:
-                    scores[ans['category']] += value_map[ans['answer']]
-
-                positive_scores = {cat: score for cat, score in scores.items() if score > 0}
-                top_categories = sorted(positive_scores, key=positive_scores.get, reverse=True)[:2] # Get top 2 categories
-
-                results_text = f"### {T('Your Top 2 Recommended Subjects')}:\n"
-                recommended_subjects = []
-                if top_categories:
-                    recommendations = []
-                    for category in top_categories:
-                        recommendations.extend(career_mapping.get(category, []))
-                    
-                    final_recommendations = Counter(recommendations).most_common(2) # Get top 2 subjects
-                    for subject, count in final_recommendations:
-                        recommended_subjects.append(subject)
-                        results_text += f"- **{T(subject)}**\n"
-                else:
-                    results_text += T("Your responses did not strongly point to a specific category. Try again to get a recommendation.")
-                
-                st.session_state.chat_history.append({"role": "assistant", "content": results_text})
-
-                # --- AI RECOMMENDATION PART ---
-                if recommended_subjects:
-                    reco_text = f"\n---\n\n### {T('AI University Recommendations')}\n"
-                    reco_text += f"{T('Based on your results, here are the top-ranked universities for your recommended subjects:')}\n"
-                    
-                    for subject in recommended_subjects:
-                        reco_text += f"\n#### {T('Top 5 for')} **{T(subject)}**\n"
-                        # Filter universities that offer the subject and sort by rank
-                        subject_df = uni_df[uni_df['Subject'].str.contains(subject, case=False, na=False)].sort_values(by='Rank').head(5)
-                        if not subject_df.empty:
-                            for i, row in subject_df.iterrows():
-                                # The university name is now a clickable link
-                                reco_text += f"1. **<a href='{row['Website']}' target='_blank'>{row['University']}</a>** ({T('Rank')}: {row['Rank']})\n"
-                        else:
-                            reco_text += f"_{T('No specific top universities found in our database for this subject.')}_\n"
-                    
-                    st.session_state.chat_history.append({"role": "assistant", "content": reco_text})
-
-
-                st.session_state.results_calculated = True
-                st.rerun()
-
-        if st.button(T("Take Assessment Again")):
-            # Reset all relevant session state keys
-            for key in ["assessment_step", "assessment_answers", "chat_history", "results_calculated"]:
-                if key in st.session_state:
-                    del st.session_state[key]
-            st.rerun()
+        st.button(T("Take Assessment Again"), on_click=_reset_assessment)
+
+    # Answer clicks rerun only this fragment, so the session is saved from here as well
+    if save_session is not None:
+        save_session()
+
+def show_page(T, questions, scoring_model, recommendation_index, save_session=None):
+    """
+    Renders the chat-based assessment and provides university recommendations.
+    save_session, if given, is called after every answer to persist the session.
+    """
+    st.title(f"📝 {T('Career Assessment')}")
+    st.write(T("Answer the questions as they appear to discover your recommended subjects."))
+
+    _chat(T, questions, scoring_model, recommendation_index, save_session)
@@ -0,0 +1,211 @@
+"""
+Headless batch assessment: scores many students' answer sets and recommends subjects and
+top universities for each, using the same question set and university data as the app.
+
+Input is CSV or JSONL, chosen by file extension:
+    CSV    an optional 'student_id' column plus one column per question, 'q1' .. 'qN'
+    JSONL  one object per line: {"student_id": "...", "answers": [...]}
+Answers are response labels ('Agree', any letter case) or values from -2 to 2; blanks count
+as neutral. A student with any other answer, or a JSONL line that is not a JSON object,
+gets an 'error' field instead of recommendations.
+
+Output is JSONL (default) or CSV, one line per student in input order. Input is read
+and written in chunks, and a bounded number of chunks is scored in parallel across a
+process pool, so memory stays flat however large the file is.
+
+Usage:
+    python batch_assess.py answers.csv results.jsonl
+    python batch_assess.py answers.jsonl results.csv --workers 8 --top-subjects 3
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from data_loader import (
+    ASSESSMENT_JSON, UNIVERSITIES_CSV, UNIVERSITY_UPDATES_DIR, apply_delta_files, list_delta_files, load_assessment,
+    load_universities,
+)
+from recommendations import RecommendationIndex
+from scoring import ScoringModel
+
+DEFAULT_CHUNK_SIZE = 500
+
+# Per-process scoring state, built once by _init_worker
+_worker = {}
+
+
+def _init_worker(universities_csv, updates_dir, assessment_json, top_universities):
+    questions, career_mapping = load_assessment(assessment_json)
+    # The catalogue as the app serves it: the CSV with the pending delta files applied
+    uni_df, _ = apply_delta_files(load_universities(universities_csv), list_delta_files(updates_dir))
+    _worker['model'] = ScoringModel(questions, career_mapping)
+    _worker['recommendations'] = RecommendationIndex(uni_df, career_mapping, top_universities)
+
+
+def _parse_answer(value):
+    """Returns an answer label or value from a raw cell; blanks are neutral."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return 0
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def score_chunk(records, top_subjects):
+    """
+    Scores a chunk of (student_id, answers, error) records in one batch. Runs in a worker.
+    A record that could not be read or has an invalid answer gets an 'error' instead of
+    recommendations, so one bad row never stops the run.
+    """
+    model, recommendations = _worker['model'], _worker['recommendations']
+    vectors, errors = [], {}
+    for row, (_, answers, error) in enumerate(records):
+        if error is None:
+            try:
+                vectors.append(model.encode_answers([_parse_answer(a) for a in answers]))
+                continue
+            except ValueError as e:
+                error = str(e)
+        errors[row] = error
+        vectors.append(np.zeros(model.n_questions))
+    _, subject_scores, confidence = model.score_batch(vectors)
+
+    results = []
+    for row, (student_id, _, _) in enumerate(records):
+        if row in errors:
+            results.append({'student_id': student_id, 'recommendations': [], 'error': errors[row]})
+            continue
+        subjects = []
+        for i in (-subject_scores[row]).argsort(kind='stable')[:top_subjects]:
+            if subject_scores[row, i] <= 0:
+                break
+            subject = model.subjects[i]
+            subjects.append({
+                'subject': subject,
+                'score': float(subject_scores[row, i]),
+                'confidence': round(float(confidence[row, i]), 4),
+                'universities': recommendations.top_for_subject(subject, recommendations.top_n),
+            })
+        results.append({'student_id': student_id, 'recommendations': subjects})
+    return results
+
+
+def read_records(path, n_questions):
+    """
+    Yields (student_id, answers, error) from a CSV or JSONL file, one student at a time.
+    error is None, or says why a JSONL line could not be read; such a line is reported
+    under its line number.
+    """
+    if path.endswith('.jsonl'):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield str(line_number), [], f'line {line_number}: invalid JSON ({e})'
+                    continue
+                if not isinstance(record, dict):
+                    yield str(line_number), [], f'line {line_number}: expected a JSON object'
+                    continue
+                student_id = str(record.get('student_id', line_number))
+                answers = record.get('answers', [])
+                if not isinstance(answers, list):
+                    yield student_id, [], f'line {line_number}: answers must be a list'
+                    continue
+                yield student_id, answers, None
+    else:
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            for row_number, row in enumerate(csv.DictReader(f), 1):
+                answers = [row.get(f'q{i}') for i in range(1, n_questions + 1)]
+                yield row.get('student_id') or str(row_number), answers, None
+
+
+def _chunks(records, chunk_size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class _ResultWriter:
+    """Writes results as JSONL, or as a flat CSV with one row per recommended subject."""
+
+    def __init__(self, f, as_csv):
+        self.f = f
+        self.csv = csv.writer(f) if as_csv else None
+        if self.csv:
+            self.csv.writerow(['student_id', 'position', 'subject', 'confidence', 'top_universities', 'error'])
+
+    def write(self, result):
+        if not self.csv:
+            self.f.write(json.dumps(result, ensure_ascii=False) + '\n')
+            return
+        if not result['recommendations']:
+            self.csv.writerow([result['student_id'], '', '', '', '', result.get('error', '')])
+        for position, reco in enumerate(result['recommendations'], 1):
+            universities = '; '.join(u['University'] for u in reco['universities'])
+            self.csv.writerow([result['student_id'], position, reco['subject'], reco['confidence'], universities, ''])
+
+
+def run(input_path, output_path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, top_subjects=2, top_universities=5,
+        universities_csv=UNIVERSITIES_CSV, assessment_json=ASSESSMENT_JSON, updates_dir=UNIVERSITY_UPDATES_DIR):
+    """Streams input_path through the process pool into output_path. Returns the number of students."""
+    questions, _ = load_assessment(assessment_json)
+    workers = workers or os.cpu_count() or 1
+    count = 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(universities_csv, updates_dir, assessment_json, top_universities)) as pool, \
+            open(output_path, 'w', encoding='utf-8', newline='') as out:
+        writer = _ResultWriter(out, as_csv=output_path.endswith('.csv'))
+        # At most two chunks per worker are in flight, which bounds memory and keeps order
+        pending = deque()
+        for chunk in _chunks(read_records(input_path, len(questions)), chunk_size):
+            pending.append(pool.submit(score_chunk, chunk, top_subjects))
+            if len(pending) >= workers * 2:
+                for result in pending.popleft().result():
+                    writer.write(result)
+                    count += 1
+        while pending:
+            for result in pending.popleft().result():
+                writer.write(result)
+                count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score student answer sets and recommend subjects and universities.')
+    parser.add_argument('input', help='CSV or JSONL file of answer sets.')
+    parser.add_argument('output', help='Output file; .csv for CSV, anything else for JSONL.')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count).')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Students scored per batch.')
+    parser.add_argument('--top-subjects', type=int, default=2)
+    parser.add_argument('--top-universities', type=int, default=5)
+    parser.add_argument('--universities', default=UNIVERSITIES_CSV)
+    parser.add_argument('--updates', default=UNIVERSITY_UPDATES_DIR, help='Directory of university delta files.')
+    parser.add_argument('--questions', default=ASSESSMENT_JSON)
+    args = parser.parse_args()
+
+    count = run(args.input, args.output, args.workers, args.chunk_size, args.top_subjects, args.top_universities,
+                args.universities, args.questions, args.updates)
+    print(f'Scored {count} students into {args.output}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+Headless multi-session load test of the app's page routing.
+
+Drives Home.py through Streamlit's AppTest from many simulated sessions, each clicking
+through the home page, the Finder (search, filters, paging), the full career assessment
+and the About page. Each worker process stands in for one server replica: its sessions
+are interleaved step by step and share that process's caches, as sessions on one
+Streamlit server do. (AppTest cannot compile scripts from several threads at once, so
+parallelism comes from processes.) The Azure translator is replaced with a local
+stand-in and the translation store lives in a temporary directory, so no network or
+shared state is touched. Per-action latency percentiles are written as JSON.
+
+Usage:
+    python benchmarks/load_test.py --sessions 20 --processes 4 --output load_test.json
+"""
+import argparse
+import functools
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import translation_store  # noqa: E402
+import utils  # noqa: E402
+from build_language_packs import fake_translate  # noqa: E402
+
+LANGUAGES = ['en', 'id', 'zh-Hans']
+SEARCHES = ['engineering', 'harvrd', 'asia', 'law', 'ecole']
+
+
+def _fake_client_translate(self, texts, to_language):
+    return fake_translate(texts, to_language)
+
+
+def run_session(session_number, timeout):
+    """
+    One simulated user session, as a generator that performs one rerun per step and
+    yields (action, seconds) for it.
+    """
+    rng = random.Random(session_number)
+
+    def step(action, func=None):
+        if func:
+            func()
+        started = time.perf_counter()
+        at.run(timeout=timeout)
+        if at.exception:
+            raise RuntimeError(f"Session {session_number} failed on {action}: {at.exception[0].value}")
+        return action, time.perf_counter() - started
+
+    at = AppTest.from_file(os.path.join(ROOT, 'Home.py'), default_timeout=timeout)
+    at.session_state['language_code'] = rng.choice(LANGUAGES)
+    yield step('home')
+
+    at.session_state['page'] = 'finder'
+    yield step('open_finder')
+    yield step('finder_search', lambda: at.text_input[0].input(rng.choice(SEARCHES)))
+    yield step('finder_clear_search', lambda: at.text_input[0].input(''))
+    yield step('finder_toggle_continent', lambda: at.sidebar.checkbox[0].uncheck())
+    next_button = [button for button in at.button if button.label.endswith('→')]
+    if next_button:
+        yield step('finder_next_page', lambda: next_button[0].click())
+
+    at.session_state['page'] = 'assessment'
+    yield step('open_assessment')
+    while True:
+        answers = [button for button in at.button if button.key and button.key.startswith('q_')]
+        if not answers:
+            break
+        yield step('assessment_answer', lambda: rng.choice(answers).click())
+
+    at.session_state['page'] = 'about'
+    yield step('open_about')
+
+
+def run_replica(session_numbers, timeout, store_dir):
+    """
+    Runs several sessions in one process, interleaving their steps round-robin.
+    Returns every (action, seconds) timing.
+    """
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    store_path = os.path.join(store_dir, f'translations_{os.getpid()}.sqlite3')
+    with mock.patch('translation_client.TranslatorClient.translate', _fake_client_translate), \
+            mock.patch.object(utils, 'TranslationStore', functools.partial(translation_store.TranslationStore, path=store_path)):
+        sessions = [run_session(n, timeout) for n in session_numbers]
+        timings = []
+        while sessions:
+            for session in list(sessions):
+                try:
+                    timings.append(next(session))
+                except StopIteration:
+                    sessions.remove(session)
+        return timings
+
+
+def summarize(all_timings):
+    """Groups timings by action and returns count and latency percentiles in milliseconds."""
+    by_action = {}
+    for action, seconds in all_timings:
+        by_action.setdefault(action, []).append(seconds * 1000)
+    summary = {}
+    for action, values in sorted(by_action.items()):
+        values.sort()
+        summary[action] = {
+            'count': len(values),
+            'mean_ms': statistics.fmean(values),
+            'p50_ms': values[len(values) // 2],
+            'p95_ms': values[min(len(values) - 1, int(len(values) * 0.95))],
+            'max_ms': values[-1],
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Multi-session AppTest load test with a mocked translator.')
+    parser.add_argument('--sessions', type=int, default=10)
+    parser.add_argument('--processes', type=int, default=2, help='Worker processes, one per simulated replica.')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Per-rerun timeout in seconds.')
+    parser.add_argument('--output', default='load_test_results.json')
+    args = parser.parse_args()
+
+    output_path = os.path.abspath(args.output)
+    os.chdir(ROOT)  # Data paths are relative to the repository root
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        replicas = [list(range(args.sessions))[i::args.processes] for i in range(args.processes)]
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.processes) as pool:
+            replica_timings = list(pool.map(run_replica, replicas, [args.timeout] * args.processes,
+                                            [store_dir] * args.processes))
+        wall_seconds = time.perf_counter() - started
+
+    all_timings = [timing for timings in replica_timings for timing in timings]
+    result = {
+        'meta': {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'), 'sessions': args.sessions,
+                 'processes': args.processes, 'wall_seconds': wall_seconds,
+                 'reruns': len(all_timings), 'reruns_per_second': len(all_timings) / wall_seconds},
+        'actions': summarize(all_timings),
+    }
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    print(json.dumps(result['meta']), file=sys.stderr)
+    print(f'Wrote load test results to {output_path}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Times the app's hot paths on synthetic catalogues of increasing size.
+
+For each size a catalogue in the data/universities.csv schema is generated, then data
+loading, index builds, Finder filtering, sorting and search, export, recommendation
+lookup and assessment scoring are each timed over several repeats. Results are written
+as JSON so runs can be compared and scaling cliffs spotted.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 100000 1000000 --repeat 3 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data_loader import load_assessment, load_universities, parse_universities_csv  # noqa: E402
+from finder_export import build_export  # noqa: E402
+from finder_index import UniversityIndex  # noqa: E402
+from finder_search import SearchIndex  # noqa: E402
+from recommendations import RecommendationIndex  # noqa: E402
+from scoring import ScoringModel  # noqa: E402
+from synthetic import write_catalogue  # noqa: E402
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+SEARCH_QUERIES = ['national', 'engneering', 'ecole', 'computer science', 'asia', 'zzz']
+SCORING_BATCH = 10000
+
+
+def timeit(func, repeat):
+    """Runs func repeat times and returns (timings summary, last result)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    summary = {'repeat': repeat, 'min_s': min(timings), 'median_s': statistics.median(timings),
+               'mean_s': statistics.fmean(timings), 'max_s': max(timings)}
+    return summary, result
+
+
+def run_size(size, workdir, repeat):
+    """Runs every benchmark on a synthetic catalogue of `size` rows."""
+    results = []
+
+    def record(name, func, times=repeat, **extra):
+        summary, result = timeit(func, times)
+        results.append({'size': size, 'benchmark': name, **summary, **extra})
+        print(f"  {name:<32} median {summary['median_s'] * 1000:10.2f} ms", file=sys.stderr)
+        return result
+
+    csv_path = os.path.join(workdir, f'universities_{size}.csv')
+    snapshot_path = os.path.join(workdir, f'universities_{size}.arrow')
+    write_catalogue(size, csv_path)
+
+    record('load_parse_csv', lambda: parse_universities_csv(csv_path))
+    record('load_compile_snapshot', lambda: (os.path.exists(snapshot_path) and os.remove(snapshot_path),
+                                             load_universities(csv_path, snapshot_path)), times=1)
+    df = record('load_snapshot', lambda: load_universities(csv_path, snapshot_path))
+
+    questions, career_mapping = load_assessment()
+    index = record('build_finder_index', lambda: UniversityIndex(df), times=1)
+    search_index = record('build_search_index', lambda: SearchIndex(df, cache_bytes=0), times=1)
+    recommendation_index = record('build_recommendation_index', lambda: RecommendationIndex(df, career_mapping), times=1)
+
+    some_subjects = index.subjects[:3]
+    positions = record('filter_all_continents', lambda: index.filter(index.continents))
+    record('filter_continent_subjects', lambda: index.filter(index.continents[:1], some_subjects, ['PhD']))
+    record('filter_ranges', lambda: index.filter(index.continents, ranges={
+        'Tuition_Min_USD': (None, 20000), 'Tuition_Max_USD': (5000, None), 'Rank': (1, max(size // 2, 1))}))
+    record('sort_tuition_then_rank', lambda: index.sort(positions, [('Tuition_Min_USD', False), ('Rank', False)]))
+
+    for query in SEARCH_QUERIES:
+        record(f'search:{query}', lambda: search_index.search(query), matches=int(len(search_index.search(query))))
+
+    for export_format in ('CSV', 'CSV (gzip)', 'Parquet'):
+        data = record(f'export:{export_format}', lambda: build_export(df, positions, export_format), times=1)
+        results[-1]['bytes'] = len(data)
+
+    subjects = [s for subjects in career_mapping.values() for s in subjects]
+    record('recommendation_lookup_all_subjects', lambda: [recommendation_index.top_for_subject(s) for s in subjects])
+
+    model = ScoringModel(questions, career_mapping)
+    answers = np.random.default_rng(0).integers(-2, 3, size=(SCORING_BATCH, model.n_questions))
+    record(f'score_batch_{SCORING_BATCH}', lambda: model.score_batch(answers))
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the app hot paths on synthetic catalogues.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default='benchmark_results.json')
+    args = parser.parse_args()
+
+    output_path = os.path.abspath(args.output)
+    os.chdir(ROOT)  # Data paths are relative to the repository root
+    run = {
+        'meta': {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'), 'git_revision': git_revision(),
+                 'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+                 'repeat': args.repeat},
+        'results': [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            print(f'{size} rows', file=sys.stderr)
+            run['results'] += run_size(size, workdir, args.repeat)
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(run, f, indent=2)
+    print(f'Wrote {len(run["results"])} results to {output_path}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Generates synthetic university catalogues in the data/universities.csv schema.
+
+Values are drawn from the real catalogue's vocabularies (continents, subjects, levels,
+open dates) with a fixed seed, so runs of the same size are reproducible.
+
+Usage:
+    python benchmarks/synthetic.py 100000 /tmp/universities_100k.csv
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_loader import UNIVERSITIES_CSV, parse_universities_csv  # noqa: E402
+
+NAME_PARTS = ['North', 'South', 'East', 'West', 'Central', 'Royal', 'National', 'Metropolitan', 'Technical',
+              'Polytechnic', 'State', 'Coastal', 'Highland', 'Lakeside', 'École', 'Universität']
+LEVELS = ['Bachelor', 'Master', 'PhD']
+
+
+def real_vocabularies(csv_path=UNIVERSITIES_CSV):
+    """Returns the continents, subjects and open dates used by the real catalogue."""
+    df = parse_universities_csv(csv_path)
+    subjects = sorted({subject for subjects in df['Subject_List'] for subject in subjects})
+    return sorted(df['Continent'].unique()), subjects, sorted(df['Application_Open'].unique())
+
+
+def generate_rows(n_rows, seed=42, csv_path=UNIVERSITIES_CSV):
+    """Yields n_rows catalogue rows as lists in the CSV column order."""
+    rng = random.Random(seed)
+    continents, subjects, open_dates = real_vocabularies(csv_path)
+    for rank in range(1, n_rows + 1):
+        name = f"{rng.choice(NAME_PARTS)} {rng.choice(NAME_PARTS)} University {rank}"
+        slug = f"u{rank}"
+        low = rng.randrange(0, 60000, 500)
+        yield [
+            rank,
+            name,
+            rng.choice(continents),
+            '; '.join(rng.sample(subjects, rng.randint(3, 8))),
+            ';'.join(LEVELS[:rng.randint(1, 3)]),
+            f"https://www.{slug}.edu/",
+            f"admissions@{slug}.edu",
+            rng.choice(open_dates),
+            f"{low}-{low + rng.randrange(1000, 20000, 500)}",
+            ', '.join(rng.sample(subjects, 3)),
+        ]
+
+
+def write_catalogue(n_rows, path, seed=42):
+    """Writes a synthetic catalogue of n_rows to path (latin-1, like the real file)."""
+    with open(UNIVERSITIES_CSV, 'r', encoding='latin-1', newline='') as f:
+        header = next(csv.reader(f))
+    with open(path, 'w', encoding='latin-1', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(generate_rows(n_rows, seed))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic university catalogue.')
+    parser.add_argument('rows', type=int)
+    parser.add_argument('output')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    write_catalogue(args.rows, args.output, args.seed)
+    print(f'Wrote {args.rows} rows to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
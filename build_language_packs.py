@@ -0,0 +1,136 @@
+"""
+Builds the per-language translation packs that T() loads at startup.
+
+Extracts every translatable string ahead of time (literal T('...') strings in the page
+modules, the assessment questions, categories and subjects, and the Continent/Subject/Level
+values in the university data), translates them in bulk and writes one compact JSON pack
+per language to data/lang_packs/.
+
+Usage:
+    python build_language_packs.py                       # Azure, credentials from env
+    python build_language_packs.py --languages id        # a single language
+    python build_language_packs.py --translator fake     # offline stand-in, no network
+
+Fake packs only tag each string with its language, so unless --output-dir says otherwise
+they go to .cache/fake_lang_packs/ and never replace the packs the app serves.
+"""
+import argparse
+import ast
+import csv
+import json
+import os
+
+from translation_client import TranslatorClient
+from utils import LANGUAGE_PACK_DIR, _chunk_texts
+
+PAGE_MODULES = ['Home.py', 'about.py', 'university_finder.py', 'assessment.py']
+QUESTIONS_PATH = os.path.join('data', 'assessment_questions.json')
+UNIVERSITIES_PATH = os.path.join('data', 'universities.csv')
+DEFAULT_LANGUAGES = ['id', 'zh-Hans']
+FAKE_LANGUAGE_PACK_DIR = os.path.join('.cache', 'fake_lang_packs')
+
+
+def extract_module_strings(path):
+    """
+    Returns the string literals passed directly to T() in a module, including inside
+    f-strings, plus the module-level *_STRINGS lists the pages use for prefetching.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    strings = []
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'T'
+                and node.args and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str)):
+            strings.append(node.args[0].value)
+
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and isinstance(node.value, (ast.List, ast.Tuple))
+                and any(isinstance(t, ast.Name) and t.id.endswith('_STRINGS') for t in node.targets)):
+            strings += [elt.value for elt in node.value.elts if isinstance(elt, ast.Constant) and isinstance(elt.value, str)]
+    return strings
+
+
+def extract_data_strings():
+    """Returns the assessment and university values that the pages translate at runtime."""
+    with open(QUESTIONS_PATH, 'r', encoding='utf-8') as f:
+        assessment_data = json.load(f)
+
+    strings = [q['question'] for q in assessment_data['questions']]
+    strings += [q['category'] for q in assessment_data['questions']]
+    strings += [subject for subjects in assessment_data['career_mapping'].values() for subject in subjects]
+
+    # Same encoding as load_all_data
+    with open(UNIVERSITIES_PATH, 'r', encoding='latin-1', newline='') as f:
+        for row in csv.DictReader(f):
+            strings.append(row['Continent'].strip())
+            for column in ('Subject', 'Level'):
+                strings += [value.strip() for value in row[column].split(';')]
+    return strings
+
+
+def extract_all_strings():
+    """Returns every known translatable string, deduplicated and sorted."""
+    strings = []
+    for path in PAGE_MODULES:
+        strings += extract_module_strings(path)
+    strings += extract_data_strings()
+    return sorted({s for s in strings if s})
+
+
+def fake_translate(texts, to_language):
+    """Local stand-in translator for tests and offline builds: tags each string with its language."""
+    return [f'[{to_language}] {text}' for text in texts]
+
+
+def azure_translate(texts, to_language, azure_key, azure_endpoint, azure_region):
+    """Translates texts with as few Azure /translate calls as the API limits allow."""
+    client = TranslatorClient(azure_key, azure_endpoint, azure_region)
+    translations = []
+    for chunk in _chunk_texts(texts):
+        translations += client.translate(chunk, to_language)
+    client.close()
+    return translations
+
+
+def write_pack(language, strings, translations, output_dir=LANGUAGE_PACK_DIR):
+    """Writes a compact {text: translation} pack for one language and returns its path."""
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f'{language}.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(dict(zip(strings, translations)), f, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-translate all UI strings and dataset values into language packs.')
+    parser.add_argument('--languages', nargs='+', default=DEFAULT_LANGUAGES, help='Target language codes.')
+    parser.add_argument('--translator', choices=['azure', 'fake'], default='azure',
+                        help="'fake' uses a local stand-in that needs no network.")
+    parser.add_argument('--output-dir', default=None,
+                        help=f'Where to write the packs (default: {LANGUAGE_PACK_DIR}, or {FAKE_LANGUAGE_PACK_DIR} '
+                             'with --translator fake).')
+    parser.add_argument('--azure-key', default=os.environ.get('AZURE_TRANSLATOR_KEY'))
+    parser.add_argument('--azure-endpoint', default=os.environ.get('AZURE_TRANSLATOR_ENDPOINT', 'https://api.cognitive.microsofttranslator.com/'))
+    parser.add_argument('--azure-region', default=os.environ.get('AZURE_TRANSLATOR_REGION'))
+    args = parser.parse_args()
+
+    if args.translator == 'azure' and not (args.azure_key and args.azure_region):
+        parser.error('Azure credentials are required: set AZURE_TRANSLATOR_KEY and AZURE_TRANSLATOR_REGION, or use --translator fake.')
+
+    output_dir = args.output_dir or (FAKE_LANGUAGE_PACK_DIR if args.translator == 'fake' else LANGUAGE_PACK_DIR)
+
+    strings = extract_all_strings()
+    print(f'Extracted {len(strings)} translatable strings.')
+
+    for language in args.languages:
+        if args.translator == 'fake':
+            translations = fake_translate(strings, language)
+        else:
+            translations = azure_translate(strings, language, args.azure_key, args.azure_endpoint, args.azure_region)
+        path = write_pack(language, strings, translations, output_dir)
+        print(f'Wrote {len(strings)} translations to {path}')
+
+
+if __name__ == '__main__':
+    main()
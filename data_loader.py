@@ -0,0 +1,243 @@
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import metrics
+from finder_index import normalize_term
+
+logger = logging.getLogger('gerbang_kampus.data')
+
+UNIVERSITIES_CSV = os.path.join('data', 'universities.csv')
+ASSESSMENT_JSON = os.path.join('data', 'assessment_questions.json')
+# Compiled, memory-mappable snapshot of the typed university table
+UNIVERSITIES_SNAPSHOT = os.path.join('.cache', 'universities.arrow')
+# Delta files (same columns as the CSV plus Action) applied on top of it, in file name order
+UNIVERSITY_UPDATES_DIR = os.path.join('data', 'updates')
+DELTA_ACTIONS = {'add', 'change', 'remove'}
+# Bump when the typed schema below changes, so old snapshots are rebuilt
+SNAPSHOT_FORMAT_VERSION = '1'
+
+REQUIRED_COLUMNS = [
+    'Rank', 'University', 'Continent', 'Subject', 'Level', 'Website', 'Email',
+    'Application_Open', 'Tuition_USD_Range', 'Subject_Expertise',
+]
+
+
+def _file_fingerprint(path):
+    """Returns a content hash of path, used to tell whether a snapshot is stale."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return f'{SNAPSHOT_FORMAT_VERSION}:{digest.hexdigest()}'
+
+
+def _split_list(value):
+    """Splits a semicolon-delimited cell into its stripped, non-empty values."""
+    if not isinstance(value, str):
+        return []
+    return [item.strip() for item in value.split(';') if item.strip()]
+
+
+def _type_universities(df, path):
+    """Validates the required columns of a raw, all-text university table and adds the typed columns."""
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"{path} is missing required columns: {', '.join(missing)}")
+
+    for column in REQUIRED_COLUMNS:
+        df[column] = df[column].str.strip()
+
+    ranks = pd.to_numeric(df['Rank'], errors='coerce')
+    if ranks.isna().any():
+        bad_rows = (ranks[ranks.isna()].index + 2).tolist()  # +2: header line and 1-based numbering
+        raise ValueError(f"{path} has a missing or non-numeric Rank on line(s) {bad_rows[:10]}")
+    df['Rank'] = ranks.astype('int64')
+
+    tuition = df['Tuition_USD_Range'].str.replace(',', '').str.extract(r'^\s*(\d+(?:\.\d+)?)\s*(?:-\s*(\d+(?:\.\d+)?))?\s*$')
+    df['Tuition_Min_USD'] = pd.to_numeric(tuition[0], errors='coerce')
+    # A single figure is both the minimum and the maximum
+    df['Tuition_Max_USD'] = pd.to_numeric(tuition[1], errors='coerce').fillna(df['Tuition_Min_USD'])
+
+    df['Application_Open_Date'] = pd.to_datetime(df['Application_Open'], format='%m/%d/%Y', errors='coerce')
+
+    df['Subject_List'] = df['Subject'].map(_split_list)
+    df['Level_List'] = df['Level'].map(_split_list)
+    return df
+
+
+def parse_universities_csv(path=UNIVERSITIES_CSV):
+    """
+    Parses and validates the university CSV into a typed DataFrame.
+
+    The original text columns are kept for display. Alongside them: Rank as an integer,
+    Tuition_Min_USD/Tuition_Max_USD parsed from ranges like '55000-65000',
+    Application_Open_Date parsed from dates like '9/1/2025', and Subject_List/Level_List
+    holding the semicolon-delimited values as lists.
+    """
+    # 'latin-1' handles the special characters in the CSV file
+    df = pd.read_csv(path, encoding='latin-1', dtype=str, keep_default_na=False)
+    return _type_universities(df, path)
+
+
+def write_snapshot(df, snapshot_path, fingerprint):
+    """Writes df as an uncompressed Arrow IPC file (so it can be memory-mapped), atomically."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'source_fingerprint': fingerprint.encode()})
+
+    if os.path.dirname(snapshot_path):
+        os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+    tmp_path = f'{snapshot_path}.{os.getpid()}.tmp'
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    # Replace in one step, so other workers never read a half-written snapshot
+    os.replace(tmp_path, snapshot_path)
+
+
+def _arrow_backed(table):
+    """
+    Wraps an Arrow table as a DataFrame of Arrow-backed columns without copying: the
+    columns keep pointing at the table's buffers, e.g. at a memory-mapped snapshot.
+    """
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def read_snapshot(snapshot_path, fingerprint):
+    """
+    Memory-maps the snapshot and returns it as a DataFrame, or None if it is missing or stale.
+
+    The columns stay Arrow-backed over the map (lists included; they read back as Python
+    lists), so the table lives in the OS page cache and every worker process reading the
+    same snapshot shares those pages instead of holding a private copy. The map stays
+    valid after the file is replaced by a newer snapshot.
+    """
+    if not os.path.exists(snapshot_path):
+        return None
+    try:
+        with pa.memory_map(snapshot_path, 'r') as source:
+            table = pa.ipc.open_file(source).read_all()
+    except (OSError, pa.ArrowInvalid):
+        return None
+    if (table.schema.metadata or {}).get(b'source_fingerprint') != fingerprint.encode():
+        return None
+    return _arrow_backed(table)
+
+
+def load_universities(csv_path=UNIVERSITIES_CSV, snapshot_path=UNIVERSITIES_SNAPSHOT):
+    """
+    Returns the typed university table, read from the compiled snapshot when it is up to
+    date with the CSV and otherwise parsed from the CSV and compiled first. Either way
+    the columns are Arrow-backed, memory-mapped when the snapshot could be written.
+    """
+    fingerprint = _file_fingerprint(csv_path)
+    df = read_snapshot(snapshot_path, fingerprint)
+    if df is None:
+        parsed = parse_universities_csv(csv_path)
+        try:
+            write_snapshot(parsed, snapshot_path, fingerprint)
+            df = read_snapshot(snapshot_path, fingerprint)
+        except OSError:
+            pass  # A read-only deployment simply parses the CSV on every start
+        if df is None:
+            df = _arrow_backed(pa.Table.from_pandas(parsed, preserve_index=False))
+    return df
+
+
+def parse_delta_csv(path):
+    """
+    Parses a university delta file into (upserts, removed names).
+
+    A delta has the universities.csv columns plus an Action column: 'add' and 'change'
+    rows carry the full record (a change replaces the university with the same name),
+    'remove' rows only need the University name, so a remove-only delta may have just
+    the Action and University columns.
+    """
+    df = pd.read_csv(path, encoding='latin-1', dtype=str, keep_default_na=False)
+    if 'Action' not in df.columns or 'University' not in df.columns:
+        raise ValueError(f"{path} needs an Action and a University column")
+
+    actions = df['Action'].str.strip().str.lower()
+    unknown = sorted(set(actions) - DELTA_ACTIONS)
+    if unknown:
+        raise ValueError(f"{path} has unknown action(s) {unknown}; expected one of {sorted(DELTA_ACTIONS)}")
+
+    removed = {normalize_term(name) for name in df.loc[actions == 'remove', 'University']}
+    upserts = df[actions != 'remove'].drop(columns='Action').reset_index(drop=True)
+    if upserts.empty:
+        return upserts, removed
+    upserts = _type_universities(upserts, path)
+    # A university listed twice in one delta keeps its last record
+    upserts = upserts[~upserts['University'].map(normalize_term).duplicated(keep='last')]
+    return upserts, removed
+
+
+def apply_university_delta(df, upserts, removed):
+    """
+    Applies a parsed delta to the typed university table, matching universities by
+    normalized name, and keeps the result in rank order.
+
+    Returns (new_df, old_to_new): old_to_new maps each row of df to its row in new_df,
+    or -1 if it was removed or replaced, so indexes can carry unchanged rows over.
+    """
+    keys = df['University'].map(normalize_term)
+    replaced = removed | set(upserts['University'].map(normalize_term))
+    carried_rows = np.flatnonzero(~keys.isin(replaced).to_numpy())
+
+    combined = df.iloc[carried_rows]
+    if len(upserts):
+        # Give the parsed delta rows the table's own Arrow column types, so the columns concatenate cleanly
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+        upserts = _arrow_backed(pa.Table.from_pandas(upserts.reindex(columns=df.columns), schema=schema, preserve_index=False))
+        combined = pd.concat([combined, upserts], ignore_index=True)
+    order = np.argsort(combined['Rank'].to_numpy(), kind='stable')
+    new_df = combined.iloc[order].reset_index(drop=True)
+
+    new_position = np.empty(len(order), dtype=np.int64)
+    new_position[order] = np.arange(len(order))
+    old_to_new = np.full(len(df), -1, dtype=np.int64)
+    old_to_new[carried_rows] = new_position[:len(carried_rows)]
+    return new_df, old_to_new
+
+
+def list_delta_files(updates_dir=UNIVERSITY_UPDATES_DIR):
+    """
+    Returns the delta files in updates_dir in the order they apply (by file name). Only
+    *.csv files count, so a delta can be written under another name and renamed into place.
+    """
+    if not os.path.isdir(updates_dir):
+        return []
+    return sorted(os.path.join(updates_dir, name) for name in os.listdir(updates_dir) if name.endswith('.csv'))
+
+
+def apply_delta_files(df, paths):
+    """
+    Applies delta files to the typed university table in order.
+    Returns (new_df, old_to_new) as for apply_university_delta, composed across all files.
+
+    A delta file that cannot be read or parsed is logged and skipped, so one bad update
+    never takes the rest of the catalogue down with it.
+    """
+    old_to_new = np.arange(len(df), dtype=np.int64)
+    for path in paths:
+        try:
+            delta = parse_delta_csv(path)
+        except (OSError, ValueError):
+            logger.exception('Skipping university delta %s', path)
+            metrics.inc('data_delta_errors_total')
+            continue
+        df, step = apply_university_delta(df, *delta)
+        carried = old_to_new >= 0
+        old_to_new[carried] = step[old_to_new[carried]]
+    return df, old_to_new
+
+
+def load_assessment(path=ASSESSMENT_JSON):
+    """Returns (questions, career_mapping) from the assessment question file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        assessment_data = json.load(f)
+    return assessment_data['questions'], assessment_data['career_mapping']
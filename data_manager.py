@@ -0,0 +1,204 @@
+"""
+Versioned, hot-reloadable app data.
+
+A DataVersion is one immutable generation of the university table, the assessment and
+every index built from them. The DataManager polls the data files and publishes a new
+version when they change: a changed universities.csv or a changed/removed delta file
+rebuilds the university indexes, a new delta file in data/updates is applied
+incrementally (only its rows are re-indexed), and a changed assessment file only
+recompiles the scoring model and recommendations. A new version is built off to the
+side and published with a single reference assignment, so sessions still rendering
+with the previous version are never blocked or changed under them.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+import metrics
+from data_loader import (
+    ASSESSMENT_JSON, UNIVERSITIES_CSV, UNIVERSITIES_SNAPSHOT, UNIVERSITY_UPDATES_DIR,
+    apply_delta_files, list_delta_files, load_assessment, load_universities,
+)
+from finder_index import UniversityIndex
+from finder_search import SearchIndex
+from recommendations import RecommendationIndex
+from scoring import ScoringModel
+
+logger = logging.getLogger('gerbang_kampus.data')
+
+# How often the watcher thread checks the data files
+DEFAULT_POLL_SECONDS = 30
+# Superseded versions kept alive for sessions that started on them
+DEFAULT_KEEP_VERSIONS = 3
+
+
+def _file_state(path):
+    """Cheap change detection: (modification time, size), or None if the file is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class DataVersion:
+    """
+    One immutable generation of the app's data and indexes.
+
+    number increases with every published version and doubles as the data_version key of
+    caches that hold results derived from the data (e.g. Finder exports). sources records
+    the file states the version was built from; error is set on the empty stand-in used
+    when the very first load fails.
+    """
+
+    def __init__(self, number, uni_df, questions, career_mapping, finder_index, search_index,
+                 recommendation_index, scoring_model, sources=None, error=None):
+        self.number = number
+        self.uni_df = uni_df
+        self.questions = questions
+        self.career_mapping = career_mapping
+        self.finder_index = finder_index
+        self.search_index = search_index
+        self.recommendation_index = recommendation_index
+        self.scoring_model = scoring_model
+        self.sources = sources
+        self.error = error
+        self.published_at = time.time()
+
+
+class DataManager:
+    """
+    Holds the current DataVersion and replaces it when the data files change.
+
+    Readers use current (or get() for a version a session is pinned to) without locking;
+    reloads are serialized by a lock that only the reloading thread takes. Call refresh()
+    to check for changes immediately, or start_watching() to poll in a daemon thread.
+    """
+
+    def __init__(self, csv_path=UNIVERSITIES_CSV, assessment_path=ASSESSMENT_JSON,
+                 updates_dir=UNIVERSITY_UPDATES_DIR, snapshot_path=UNIVERSITIES_SNAPSHOT,
+                 keep_versions=DEFAULT_KEEP_VERSIONS):
+        self.csv_path = csv_path
+        self.assessment_path = assessment_path
+        self.updates_dir = updates_dir
+        self.snapshot_path = snapshot_path
+        self.keep_versions = keep_versions
+        self.current = None
+        self.last_error = None
+        self._versions = OrderedDict()  # number -> DataVersion, oldest first
+        # File states of the last failed reload, so a broken file is reported once, not on every poll
+        self._checked_sources = None
+        self._failed_sources = None
+        self._reload_lock = threading.Lock()
+        self._stop_watching = threading.Event()
+        self._watcher = None
+        self.refresh()
+
+    def get(self, number):
+        """Returns version number if it is still kept, otherwise the current version."""
+        return self._versions.get(number, self.current)
+
+    def refresh(self):
+        """Checks the data files and publishes a new version if anything changed. Returns True if it did."""
+        with self._reload_lock:
+            try:
+                return self._refresh()
+            except Exception as e:
+                self.last_error = e
+                self._failed_sources = self._checked_sources
+                metrics.inc('data_reloads_total', result='error')
+                if self.current is None:
+                    logger.exception('Loading the data files failed')
+                    self._publish(self._empty_version(e))
+                else:
+                    logger.exception('Reloading the data files failed; still serving version %s', self.current.number)
+                return False
+
+    def _refresh(self):
+        delta_paths = list_delta_files(self.updates_dir)
+        sources = {
+            'universities': _file_state(self.csv_path),
+            'assessment': _file_state(self.assessment_path),
+            'deltas': [(path, _file_state(path)) for path in delta_paths],
+        }
+        self._checked_sources = sources
+        previous = self.current
+        if (previous is not None and previous.sources == sources) or sources == self._failed_sources:
+            return False
+
+        started = time.perf_counter()
+        if previous is None or previous.sources is None:
+            kind = 'full'
+        elif previous.sources['universities'] != sources['universities'] \
+                or sources['deltas'][:len(previous.sources['deltas'])] != previous.sources['deltas']:
+            # A base file change, or an applied delta edited or deleted, means replaying from the base
+            kind = 'full'
+        elif len(sources['deltas']) > len(previous.sources['deltas']):
+            kind = 'delta'
+        else:
+            kind = 'assessment'
+
+        if kind == 'full':
+            uni_df, _ = apply_delta_files(load_universities(self.csv_path, self.snapshot_path), delta_paths)
+            finder_index = UniversityIndex(uni_df)
+            search_index = SearchIndex(uni_df)
+        elif kind == 'delta':
+            new_paths = delta_paths[len(previous.sources['deltas']):]
+            uni_df, old_to_new = apply_delta_files(previous.uni_df, new_paths)
+            finder_index = UniversityIndex(uni_df, update_from=(previous.finder_index, old_to_new))
+            search_index = SearchIndex(uni_df, update_from=(previous.search_index, old_to_new))
+        else:
+            uni_df, finder_index, search_index = previous.uni_df, previous.finder_index, previous.search_index
+
+        if previous is None or previous.sources is None or previous.sources['assessment'] != sources['assessment']:
+            questions, career_mapping = load_assessment(self.assessment_path)
+            scoring_model = ScoringModel(questions, career_mapping)
+        else:
+            questions, career_mapping, scoring_model = previous.questions, previous.career_mapping, previous.scoring_model
+
+        version = DataVersion(
+            (previous.number + 1) if previous is not None else 1,
+            uni_df, questions, career_mapping, finder_index, search_index,
+            RecommendationIndex(uni_df, career_mapping), scoring_model, sources,
+        )
+        metrics.observe('data_reload_seconds', time.perf_counter() - started, kind=kind)
+        metrics.inc('data_reloads_total', result='ok')
+        self._publish(version)
+        self.last_error = self._failed_sources = None
+        logger.info('Published data version %s (%s reload, %d universities)', version.number, kind, len(uni_df))
+        return True
+
+    def _empty_version(self, error):
+        uni_df, questions, career_mapping = pd.DataFrame(), [], {}
+        return DataVersion(
+            (self.current.number + 1) if self.current is not None else 1,
+            uni_df, questions, career_mapping, UniversityIndex(uni_df), SearchIndex(uni_df),
+            RecommendationIndex(uni_df, career_mapping), ScoringModel(questions, career_mapping), error=error,
+        )
+
+    def _publish(self, version):
+        # Register before switching current, so get() can always resolve the current number
+        self._versions[version.number] = version
+        self.current = version
+        while len(self._versions) > self.keep_versions:
+            self._versions.popitem(last=False)
+
+    def start_watching(self, poll_seconds=DEFAULT_POLL_SECONDS):
+        """Starts a daemon thread that calls refresh() every poll_seconds. Safe to call more than once."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+
+        def watch():
+            while not self._stop_watching.wait(poll_seconds):
+                self.refresh()
+
+        self._watcher = threading.Thread(target=watch, name='data-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop_watching.set()
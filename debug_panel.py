@@ -0,0 +1,34 @@
+import os
+
+import streamlit as st
+
+import metrics
+
+
+def debug_enabled():
+    """The panel shows with ?debug=1 in the URL or GERBANG_DEBUG=1 in the environment."""
+    return st.query_params.get('debug') == '1' or os.environ.get('GERBANG_DEBUG') == '1'
+
+
+def show_debug_panel():
+    """Renders the performance counters and stage timers in a sidebar expander."""
+    import pandas as pd  # Only sessions showing the panel pay for importing pandas
+
+    snapshot = metrics.REGISTRY.snapshot()
+    with st.sidebar.expander("⏱️ Performance", expanded=False):
+        if snapshot['timers']:
+            timers = pd.DataFrame([
+                {'metric': t['name'], 'labels': ', '.join(f'{k}={v}' for k, v in t['labels'].items()),
+                 'count': t['count'], 'mean ms': t['mean'] * 1000, 'max ms': t['max'] * 1000,
+                 'total s': t['sum']}
+                for t in snapshot['timers']
+            ])
+            st.dataframe(timers, hide_index=True, use_container_width=True)
+        if snapshot['counters']:
+            counters = pd.DataFrame([
+                {'metric': c['name'], 'labels': ', '.join(f'{k}={v}' for k, v in c['labels'].items()), 'value': c['value']}
+                for c in snapshot['counters']
+            ])
+            st.dataframe(counters, hide_index=True, use_container_width=True)
+        st.download_button("Prometheus metrics", metrics.REGISTRY.render_prometheus(),
+                           file_name='gerbang_kampus_metrics.txt', mime='text/plain')
@@ -0,0 +1,88 @@
+"""
+A local stand-in for the Azure Translator /translate endpoint, for exercising the
+translation client offline. Translations are the input tagged with the target language,
+e.g. '[id] Back to Home'.
+
+Failure modes can be injected to test timeouts, retries and the circuit breaker:
+    python fake_translator.py --port 8765
+    python fake_translator.py --port 8765 --fail-first 2 --fail-status 429 --retry-after 1
+    python fake_translator.py --port 8765 --delay 15
+
+Point the app or build_language_packs.py at http://127.0.0.1:8765/ as the endpoint.
+From Python, start_fake_translator() runs one on a background thread.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeTranslatorHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+            request_number = server.request_count
+
+        if urlparse(self.path).path != '/translate':
+            self._reply(404, {'error': {'code': 404000, 'message': 'Not found'}})
+            return
+        if server.delay:
+            time.sleep(server.delay)
+        if request_number <= server.fail_first:
+            headers = {'Retry-After': str(server.retry_after)} if server.retry_after is not None else {}
+            self._reply(server.fail_status, {'error': {'code': server.fail_status * 1000, 'message': 'Injected failure'}}, headers)
+            return
+
+        to_language = parse_qs(urlparse(self.path).query).get('to', ['en'])[0]
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'[]')
+        self._reply(200, [{'translations': [{'text': f"[{to_language}] {item['text']}", 'to': to_language}]} for item in body])
+
+    def _reply(self, status, payload, headers=None):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Keep test output quiet
+
+
+def start_fake_translator(port=0, fail_first=0, fail_status=503, retry_after=None, delay=0.0):
+    """Starts a fake translator on a background thread and returns (server, endpoint URL)."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeTranslatorHandler)
+    server.lock = threading.Lock()
+    server.request_count = 0
+    server.fail_first = fail_first
+    server.fail_status = fail_status
+    server.retry_after = retry_after
+    server.delay = delay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local fake Azure Translator endpoint.')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fail-first', type=int, default=0, help='Fail this many requests before succeeding.')
+    parser.add_argument('--fail-status', type=int, default=503)
+    parser.add_argument('--retry-after', type=float, default=None, help='Retry-After seconds sent with failures.')
+    parser.add_argument('--delay', type=float, default=0.0, help='Seconds to wait before every response.')
+    args = parser.parse_args()
+
+    server, url = start_fake_translator(args.port, args.fail_first, args.fail_status, args.retry_after, args.delay)
+    print(f'Fake translator listening on {url}')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+import gzip
+import hashlib
+import io
+import threading
+import time
+from collections import OrderedDict
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+from data_loader import REQUIRED_COLUMNS
+
+# Rows converted per chunk while streaming an export
+CHUNK_ROWS = 5000
+# Bounds for the shared cache of recently built export files
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+CACHE_TTL_SECONDS = 10 * 60
+
+# Export format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'CSV (gzip)': ('csv.gz', 'application/gzip'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def _rows(df, positions):
+    """Returns the selected rows restricted to the columns of the source CSV schema."""
+    columns = [column for column in REQUIRED_COLUMNS if column in df.columns]
+    return df.iloc[positions][columns]
+
+
+def iter_csv_chunks(df, positions, chunk_rows=CHUNK_ROWS):
+    """Yields the selected rows of df as UTF-8 CSV bytes, a header followed by row chunks."""
+    yield _rows(df, positions[:0]).to_csv(index=False).encode('utf-8')
+    for start in range(0, len(positions), chunk_rows):
+        yield _rows(df, positions[start:start + chunk_rows]).to_csv(index=False, header=False).encode('utf-8')
+
+
+def _write_gzip(df, positions, buffer):
+    with gzip.GzipFile(fileobj=buffer, mode='wb') as gz:
+        for chunk in iter_csv_chunks(df, positions):
+            gz.write(chunk)
+
+
+def _write_parquet(df, positions, buffer):
+    writer = None
+    for start in range(0, max(len(positions), 1), CHUNK_ROWS):
+        table = pa.Table.from_pandas(_rows(df, positions[start:start + CHUNK_ROWS]), preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(buffer, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+
+def build_export(df, positions, export_format):
+    """Builds the export file for the selected rows, converting them chunk by chunk."""
+    buffer = io.BytesIO()
+    if export_format == 'CSV':
+        for chunk in iter_csv_chunks(df, positions):
+            buffer.write(chunk)
+    elif export_format == 'CSV (gzip)':
+        _write_gzip(df, positions, buffer)
+    elif export_format == 'Parquet':
+        _write_parquet(df, positions, buffer)
+    else:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    return buffer.getvalue()
+
+
+class ExportCache:
+    """A small LRU of recently built export files, bounded by total size and age."""
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES, ttl_seconds=CACHE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (data, created_at)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[1] > self.ttl_seconds:
+                self._size -= len(self._entries.pop(key)[0])
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, data):
+        # Files larger than the whole budget are served but never cached
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key)[0])
+            self._entries[key] = (data, time.time())
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                self._size -= len(self._entries.popitem(last=False)[1][0])
+
+
+@st.cache_resource
+def get_export_cache():
+    """Returns the process-wide export cache."""
+    return ExportCache()
+
+
+def export_results(cache, df, positions, export_format, data_version=''):
+    """
+    Returns the export file for the selected rows, building it only if it is not cached.
+    Meant to be called lazily from the download button, i.e. only when it is clicked.
+    """
+    key = (data_version, export_format, hashlib.blake2b(positions.tobytes(), digest_size=16).hexdigest())
+    data = cache.get(key)
+    if data is None:
+        data = build_export(df, positions, export_format)
+        cache.put(key, data)
+    return data
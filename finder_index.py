@@ -0,0 +1,199 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+
+def normalize_term(term):
+    """Normalizes a subject/level/continent value for exact matching (whitespace and case)."""
+    return ' '.join(str(term).split()).casefold()
+
+
+def split_terms(value):
+    """Splits a semicolon-delimited cell into its stripped, non-empty values."""
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [str(term).strip() for term in value if str(term).strip()]
+    if not isinstance(value, str):
+        return []
+    return [term.strip() for term in value.split(';') if term.strip()]
+
+
+# Typed columns that get a sorted index for range filters and sorting
+RANGE_COLUMNS = ['Rank', 'Tuition_Min_USD', 'Tuition_Max_USD', 'Application_Open_Date']
+
+
+class SortedColumn:
+    """
+    A column's non-missing values in sorted order, with the row each one came from.
+
+    Range queries are two binary searches plus a slice of row positions, and each row's
+    dense rank in the sort order doubles as an integer sort key.
+    """
+
+    def __init__(self, values):
+        values = np.asarray(values)
+        if np.issubdtype(values.dtype, np.datetime64):
+            valid = ~np.isnat(values)
+        else:
+            values = values.astype(np.float64)
+            valid = ~np.isnan(values)
+        valid_rows = np.flatnonzero(valid)
+        order = np.argsort(values[valid_rows], kind='stable')
+        self.rows = valid_rows[order]
+        self.sorted_values = values[self.rows]
+        # Equal values share a key so later sort keys can break the tie;
+        # missing values sort after everything else
+        self.sort_keys = np.full(len(values), len(values), dtype=np.int64)
+        if len(self.rows):
+            self.sort_keys[self.rows] = np.concatenate(([0], np.cumsum(self.sorted_values[1:] != self.sorted_values[:-1])))
+
+    def bounds(self):
+        """Returns the (min, max) of the column, or None if it has no values."""
+        if not len(self.sorted_values):
+            return None
+        return self.sorted_values[0], self.sorted_values[-1]
+
+    def range_rows(self, low=None, high=None):
+        """Returns the rows whose value lies in [low, high]; None leaves that side open."""
+        start = 0 if low is None else np.searchsorted(self.sorted_values, low, side='left')
+        end = len(self.sorted_values) if high is None else np.searchsorted(self.sorted_values, high, side='right')
+        return self.rows[start:end]
+
+
+class UniversityIndex:
+    """
+    Load-time index over the university table for the Finder's checkbox filters.
+
+    Holds the sorted continent/subject/level vocabularies, the continent column as
+    categorical codes, normalized token sets per row and term -> row posting lists,
+    so filtering is a handful of mask operations instead of regex scans over every row.
+    Typed columns also get a SortedColumn for range filters and sorting.
+
+    update_from=(previous index, old_to_new) builds the index incrementally after a data
+    update: old_to_new maps each row of the previous index to its row in df (-1 if it was
+    removed or changed), and those carried-over rows reuse their token sets instead of
+    being split and normalized again.
+    """
+
+    def __init__(self, df, update_from=None):
+        self.n_rows = len(df)
+        self._update_from = update_from
+
+        continent_values = df['Continent'].astype(str).str.strip() if self.n_rows else pd.Series([], dtype=str)
+        self.continents = sorted(continent_values.unique().tolist())
+        categorical = pd.Categorical(continent_values, categories=self.continents)
+        self.continent_codes = np.asarray(categorical.codes, dtype=np.int16)
+        self.continent_postings = {
+            continent: np.flatnonzero(self.continent_codes == code)
+            for code, continent in enumerate(self.continents)
+        }
+
+        self.subject_tokens, self.subject_names, self.subjects, self.subject_postings = self._index_column(df, 'Subject')
+        self.level_tokens, self.level_names, self.levels, self.level_postings = self._index_column(df, 'Level')
+        self._update_from = None
+        # Identifies the three vocabularies, so selections stored as bitmasks over them can
+        # be recognized as stale after a data update or on another replica
+        vocabularies = '\x1d'.join('\x1e'.join(terms) for terms in (self.continents, self.subjects, self.levels))
+        self.vocabulary_key = hashlib.blake2b(vocabularies.encode(), digest_size=8).hexdigest()
+
+        self.sorted_columns = {
+            column: SortedColumn(df[column].to_numpy())
+            for column in RANGE_COLUMNS if column in df.columns
+        }
+
+    def _carried_tokens(self, column):
+        """Returns ({new row: token set}, {normalized term: spelling}) reused from the previous index."""
+        if self._update_from is None:
+            return {}, {}
+        previous, old_to_new = self._update_from
+        previous_tokens = getattr(previous, f'{column.lower()}_tokens')
+        carried = {int(new_row): previous_tokens[old_row] for old_row, new_row in enumerate(old_to_new) if new_row >= 0}
+        return carried, getattr(previous, f'{column.lower()}_names')
+
+    def _index_column(self, df, column):
+        """
+        Builds per-row token sets, the normalized term -> display spelling map, the display
+        vocabulary and posting lists for a ';' column.
+        """
+        row_tokens = []
+        display_names = {}  # normalized term -> first spelling seen in the data
+        postings = {}
+        carried, previous_names = self._carried_tokens(column)
+        # Prefer the pre-split lists from the typed loader over re-splitting the text column
+        list_column = f'{column}_List' if f'{column}_List' in df.columns else column
+        values = df[list_column].tolist() if self.n_rows else []
+        for row, value in enumerate(values):
+            tokens = carried.get(row)
+            if tokens is not None:
+                for normalized in tokens:
+                    display_names.setdefault(normalized, previous_names[normalized])
+                    postings.setdefault(normalized, []).append(row)
+                row_tokens.append(tokens)
+                continue
+
+            tokens = set()
+            for term in split_terms(value):
+                normalized = normalize_term(term)
+                display_names.setdefault(normalized, term)
+                if normalized not in tokens:
+                    tokens.add(normalized)
+                    postings.setdefault(normalized, []).append(row)
+            row_tokens.append(frozenset(tokens))
+
+        vocabulary = sorted(display_names.values())
+        posting_arrays = {display_names[term]: np.asarray(rows, dtype=np.int64) for term, rows in postings.items()}
+        return row_tokens, display_names, vocabulary, posting_arrays
+
+    def _any_mask(self, postings, selected):
+        """Returns a boolean mask of rows that contain any of the selected terms."""
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for term in selected:
+            rows = postings.get(term)
+            if rows is not None:
+                mask[rows] = True
+        return mask
+
+    def bounds(self, column):
+        """Returns the (min, max) of an indexed typed column, or None if it has no values."""
+        sorted_column = self.sorted_columns.get(column)
+        return sorted_column.bounds() if sorted_column is not None else None
+
+    def _range_mask(self, column, low, high):
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.sorted_columns[column].range_rows(low, high)] = True
+        return mask
+
+    def filter(self, continents, subjects=(), levels=(), ranges=None):
+        """
+        Returns the positions of rows in any selected continent that also offer any of the
+        selected subjects and any of the selected levels. Empty subject or level selections
+        do not filter; an empty continent selection matches nothing.
+
+        ranges maps typed columns to inclusive (low, high) bounds, either of which may be None.
+        """
+        mask = self._any_mask(self.continent_postings, continents)
+        if subjects:
+            mask &= self._any_mask(self.subject_postings, subjects)
+        if levels:
+            mask &= self._any_mask(self.level_postings, levels)
+        for column, (low, high) in (ranges or {}).items():
+            mask &= self._range_mask(column, low, high)
+        return np.flatnonzero(mask)
+
+    def sort(self, positions, keys):
+        """
+        Orders row positions by several keys, e.g. [('Tuition_Min_USD', False), ('Rank', False)].
+        Each key is (column, descending). Ties keep their existing order, and rows missing
+        a value always go last.
+        """
+        if not keys or not len(positions):
+            return positions
+        sort_arrays = []
+        # np.lexsort treats its last key as the primary one
+        for column, descending in reversed(keys):
+            sort_keys = self.sorted_columns[column].sort_keys[positions]
+            if descending:
+                missing = sort_keys == self.n_rows
+                sort_keys = np.where(missing, self.n_rows, self.n_rows - 1 - sort_keys)
+            sort_arrays.append(sort_keys)
+        return positions[np.lexsort(sort_arrays)]
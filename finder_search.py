@@ -0,0 +1,208 @@
+import bisect
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+# Columns the free-text box searches, with how much a match in each counts towards ranking
+SEARCH_FIELDS = {'University': 3.0, 'Subject': 2.0, 'Continent': 1.0}
+# How strongly each kind of token match counts
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.8
+FUZZY_SCORE = 0.5
+# Default time budget for a single query; fuzzy expansion stops once it is spent
+DEFAULT_BUDGET_MS = 50
+# Total size of the cached result arrays per index (16 MB)
+DEFAULT_CACHE_BYTES = 16 * 1024 * 1024
+TOKEN_PATTERN = re.compile(r'[\w+#]+')
+
+
+def fold_text(text):
+    """Lowercases text and strips accents, so 'École' and 'ecole' compare equal."""
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+def tokenize(text):
+    """Splits folded text into search tokens. Punctuation is never interpreted as a pattern."""
+    return TOKEN_PATTERN.findall(fold_text(text))
+
+
+def trigrams(token):
+    padded = f'  {token} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_edit_distance(a, b, limit):
+    """Levenshtein distance between a and b, or limit + 1 as soon as it must exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def max_typos(token):
+    """Allows no typos in very short tokens, one in medium ones and two in long ones."""
+    if len(token) <= 3:
+        return 0
+    return 1 if len(token) <= 7 else 2
+
+
+class SearchIndex:
+    """
+    Load-time search index for the Finder's free-text box.
+
+    Every searchable field is tokenized with accent folding into a token -> row posting
+    table. Query tokens match vocabulary tokens exactly, by prefix (binary search over the
+    sorted vocabulary) or, within a typo budget, through a trigram index. Rows must match
+    every query token and are ranked by match quality and field weight. Recent queries are
+    served from a result cache bounded by the total bytes of the cached position arrays;
+    a result bigger than the whole budget is returned but never cached, and so is one whose
+    fuzzy expansion was cut short by the time budget.
+
+    update_from=(previous index, old_to_new) builds the index incrementally after a data
+    update, as for UniversityIndex: postings of carried-over rows are renumbered rather
+    than rebuilt, and only added or changed rows are tokenized.
+    """
+
+    def __init__(self, df, cache_bytes=DEFAULT_CACHE_BYTES, budget_ms=DEFAULT_BUDGET_MS, max_expansions=64,
+                 update_from=None):
+        self.n_rows = len(df)
+        self.budget_ms = budget_ms
+        self.max_expansions = max_expansions
+        self.cache_bytes = cache_bytes
+        self._cache = OrderedDict()  # normalized query -> positions
+        self._cache_size = 0
+        self._cache_lock = threading.Lock()
+
+        # Rows carried over from a previous index keep their postings, renumbered;
+        # only the remaining (added or changed) rows are tokenized
+        rows_to_tokenize = range(self.n_rows)
+        carried = {}  # token -> [(rows, weights), ...]
+        if update_from is not None:
+            previous, old_to_new = update_from
+            for token, (rows, weights) in zip(previous.vocabulary, previous._postings):
+                new_rows = old_to_new[rows]
+                kept = new_rows >= 0
+                if kept.any():
+                    carried[token] = [(new_rows[kept], weights[kept])]
+            is_carried = np.zeros(self.n_rows, dtype=bool)
+            is_carried[old_to_new[old_to_new >= 0]] = True
+            rows_to_tokenize = np.flatnonzero(~is_carried).tolist()
+
+        # token -> {row: best field weight}
+        postings = {}
+        for column, weight in SEARCH_FIELDS.items():
+            if column not in df.columns:
+                continue
+            values = df[column].tolist()
+            for row in rows_to_tokenize:
+                value = values[row]
+                if not isinstance(value, str):
+                    continue
+                for token in tokenize(value):
+                    rows = postings.setdefault(token, {})
+                    if rows.get(row, 0) < weight:
+                        rows[row] = weight
+        for token, rows in postings.items():
+            carried.setdefault(token, []).append(
+                (np.fromiter(rows.keys(), dtype=np.int64), np.fromiter(rows.values(), dtype=np.float64)))
+
+        self.vocabulary = sorted(carried)
+        self._postings = [
+            tuple(np.concatenate(parts) for parts in zip(*carried[token])) if len(carried[token]) > 1 else carried[token][0]
+            for token in self.vocabulary
+        ]
+        self._trigrams = {}
+        for token_id, token in enumerate(self.vocabulary):
+            for gram in trigrams(token):
+                self._trigrams.setdefault(gram, []).append(token_id)
+
+    def _expand(self, query_token, deadline):
+        """
+        Returns ({vocabulary token id: match score}, complete) for one query token; complete
+        is False if the deadline passed before every fuzzy candidate was checked.
+        """
+        matches = {}
+
+        # Exact and prefix matches: a contiguous run in the sorted vocabulary
+        start = bisect.bisect_left(self.vocabulary, query_token)
+        for token_id in range(start, len(self.vocabulary)):
+            token = self.vocabulary[token_id]
+            if not token.startswith(query_token) or len(matches) >= self.max_expansions:
+                break
+            matches[token_id] = EXACT_SCORE if token == query_token else PREFIX_SCORE
+
+        limit = max_typos(query_token)
+        if limit == 0 or query_token in self.vocabulary[start:start + 1]:
+            return matches, True
+
+        # Fuzzy matches: candidates sharing trigrams, confirmed by a bounded edit distance
+        shared = {}
+        for gram in trigrams(query_token):
+            for token_id in self._trigrams.get(gram, ()):
+                shared[token_id] = shared.get(token_id, 0) + 1
+        candidates = sorted(shared, key=shared.get, reverse=True)[:self.max_expansions * 4]
+        for token_id in candidates:
+            if token_id in matches:
+                continue
+            if time.perf_counter() > deadline:
+                return matches, False
+            token = self.vocabulary[token_id]
+            # Compare against the token's prefix too, so typos in a partly typed word still match
+            distance = min(bounded_edit_distance(query_token, token, limit),
+                           bounded_edit_distance(query_token, token[:len(query_token)], limit))
+            if distance <= limit:
+                matches[token_id] = FUZZY_SCORE / (1 + distance)
+        return matches, True
+
+    def search(self, query):
+        """Returns row positions matching every token of query, best matches first."""
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            # Every row in catalogue order; cheap to build and too big to be worth caching
+            return np.arange(self.n_rows)
+
+        cache_key = ' '.join(query_tokens)
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return cached
+
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        complete = True
+        scores = np.zeros(self.n_rows)
+        matched_all = np.ones(self.n_rows, dtype=bool)
+        for query_token in query_tokens:
+            token_scores = np.zeros(self.n_rows)
+            matches, expanded = self._expand(query_token, deadline)
+            complete &= expanded
+            for token_id, match_score in matches.items():
+                rows, weights = self._postings[token_id]
+                np.maximum.at(token_scores, rows, weights * match_score)
+            matched_all &= token_scores > 0
+            scores += token_scores
+        matched = np.flatnonzero(matched_all)
+        # Stable sort keeps catalogue order (i.e. rank) between equally good matches
+        result = matched[np.argsort(-scores[matched], kind='stable')]
+
+        # A search cut short (e.g. by a GC pause) is served once, not cached for everyone
+        if complete and result.nbytes <= self.cache_bytes:
+            with self._cache_lock:
+                if cache_key not in self._cache:
+                    self._cache[cache_key] = result
+                    self._cache_size += result.nbytes
+                while self._cache_size > self.cache_bytes:
+                    self._cache_size -= self._cache.popitem(last=False)[1].nbytes
+        return result
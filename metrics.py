@@ -0,0 +1,110 @@
+"""
+Lightweight, process-wide performance instrumentation.
+
+Counters count events (cache hits, bytes sent); timers record how long a stage took,
+keeping a count, total, maximum and a few cumulative histogram buckets. Both can carry
+labels, e.g. timed('finder_stage_seconds', stage='filter'). The registry can be dumped
+in the Prometheus text format or logged as one structured JSON line.
+"""
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger('gerbang_kampus.metrics')
+
+# Upper bounds (seconds) of the cumulative timer histogram buckets
+TIMER_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}  # (name, labels) -> value
+        self._timers = {}  # (name, labels) -> {'count', 'sum', 'max', 'buckets'}
+
+    def inc(self, name, value=1, **labels):
+        """Adds value to a counter."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        """Records one duration for a timer."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            timer = self._timers.get(key)
+            if timer is None:
+                timer = self._timers[key] = {'count': 0, 'sum': 0.0, 'max': 0.0, 'buckets': [0] * len(TIMER_BUCKETS)}
+            timer['count'] += 1
+            timer['sum'] += seconds
+            timer['max'] = max(timer['max'], seconds)
+            for i, bound in enumerate(TIMER_BUCKETS):
+                if seconds <= bound:
+                    timer['buckets'][i] += 1
+
+    @contextmanager
+    def timed(self, name, **labels):
+        """Times the enclosed block, recording it even if the block raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        """Returns {'counters': [...], 'timers': [...]} as plain, JSON-friendly data."""
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            timers = [{'name': name, 'labels': dict(labels), 'count': t['count'], 'sum': t['sum'],
+                       'max': t['max'], 'mean': t['sum'] / t['count'] if t['count'] else 0.0}
+                      for (name, labels), t in sorted(self._timers.items())]
+        return {'counters': counters, 'timers': timers}
+
+    def render_prometheus(self):
+        """Returns all metrics in the Prometheus text exposition format."""
+        def fmt_labels(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self._counters}):
+                lines.append(f'# TYPE {name} counter')
+                for (metric, labels), value in sorted(self._counters.items()):
+                    if metric == name:
+                        lines.append(f'{name}{fmt_labels(labels)} {value}')
+            for name in sorted({name for name, _ in self._timers}):
+                lines.append(f'# TYPE {name} histogram')
+                for (metric, labels), t in sorted(self._timers.items()):
+                    if metric != name:
+                        continue
+                    for bound, count in zip(TIMER_BUCKETS, t['buckets']):
+                        lines.append(f'{name}_bucket{fmt_labels(labels, [("le", bound)])} {count}')
+                    lines.append(f'{name}_bucket{fmt_labels(labels, [("le", "+Inf")])} {t["count"]}')
+                    lines.append(f'{name}_sum{fmt_labels(labels)} {t["sum"]:.6f}')
+                    lines.append(f'{name}_count{fmt_labels(labels)} {t["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def log_snapshot(self, level=logging.INFO):
+        """Writes the current metrics to the log as a single JSON line."""
+        logger.log(level, json.dumps({'event': 'metrics', **self.snapshot()}))
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+
+REGISTRY = MetricsRegistry()
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+timed = REGISTRY.timed
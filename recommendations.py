@@ -0,0 +1,47 @@
+from finder_index import normalize_term, split_terms
+
+# How many universities are kept per subject and per career category
+DEFAULT_TOP_N = 5
+
+
+class RecommendationIndex:
+    """
+    Load-time subject -> top universities index for the assessment's recommendations.
+
+    Universities are walked once in rank order and appended to the list of every subject
+    they offer (exact, normalized matches) until each list holds top_n entries. Career
+    categories get the rank-ordered merge of their career_mapping subjects. A lookup is
+    then a dictionary access and a slice, independent of the size of the table.
+    """
+
+    def __init__(self, uni_df, career_mapping, top_n=DEFAULT_TOP_N):
+        self.top_n = top_n
+        self.by_subject = {}
+
+        if len(uni_df):
+            list_column = 'Subject_List' if 'Subject_List' in uni_df.columns else 'Subject'
+            ranked = uni_df.sort_values(by='Rank', kind='stable')
+            for rank, university, website, subjects in zip(
+                    ranked['Rank'].tolist(), ranked['University'].tolist(),
+                    ranked['Website'].tolist(), ranked[list_column].tolist()):
+                entry = {'University': university, 'Website': website, 'Rank': rank}
+                for subject in {normalize_term(term) for term in split_terms(subjects)}:
+                    universities = self.by_subject.setdefault(subject, [])
+                    if len(universities) < top_n:
+                        universities.append(entry)
+
+        self.by_category = {}
+        for category, subjects in career_mapping.items():
+            merged = {}
+            for subject in subjects:
+                for entry in self.by_subject.get(normalize_term(subject), []):
+                    merged.setdefault(entry['University'], entry)
+            self.by_category[category] = sorted(merged.values(), key=lambda entry: entry['Rank'])[:top_n]
+
+    def top_for_subject(self, subject, n=DEFAULT_TOP_N):
+        """Returns up to n universities offering subject, best ranked first."""
+        return self.by_subject.get(normalize_term(subject), [])[:n]
+
+    def top_for_category(self, category, n=DEFAULT_TOP_N):
+        """Returns up to n universities across a career category's subjects, best ranked first."""
+        return self.by_category.get(category, [])[:n]
@@ -0,0 +1,113 @@
+import numpy as np
+
+# Likert answer -> numeric value, in the order the answer buttons are shown
+RESPONSE_VALUES = {'Strongly Disagree': -2, 'Disagree': -1, 'Neutral': 0, 'Agree': 1, 'Strongly Agree': 2}
+# Labels as matched in encode_answers: case- and whitespace-insensitive
+_RESPONSE_VALUES_FOLDED = {label.casefold(): value for label, value in RESPONSE_VALUES.items()}
+MIN_RESPONSE_VALUE, MAX_RESPONSE_VALUE = min(RESPONSE_VALUES.values()), max(RESPONSE_VALUES.values())
+
+
+def response_value(answer):
+    """
+    Returns the numeric value of one answer: a response label in any letter case
+    ('strongly agree') or a number from -2 to 2. Raises ValueError for anything else.
+    """
+    if isinstance(answer, str):
+        value = _RESPONSE_VALUES_FOLDED.get(' '.join(answer.split()).casefold())
+        if value is None:
+            raise ValueError(f"unknown answer {answer!r}; expected one of {list(RESPONSE_VALUES)} or -2..2")
+        return value
+    try:
+        value = float(answer)
+    except (TypeError, ValueError):
+        raise ValueError(f"unknown answer {answer!r}; expected one of {list(RESPONSE_VALUES)} or -2..2") from None
+    # The comparison is False for NaN, so NaN is rejected too
+    if not MIN_RESPONSE_VALUE <= value <= MAX_RESPONSE_VALUE:
+        raise ValueError(f"answer {answer!r} is outside {MIN_RESPONSE_VALUE}..{MAX_RESPONSE_VALUE}")
+    return value
+
+
+class ScoringModel:
+    """
+    The career assessment compiled into matrices.
+
+    question_weights is questions x categories: each question adds its answer value to its
+    category, scaled by the question's optional 'weight' (default 1). subject_affinity is
+    categories x subjects from career_mapping, scaled by an optional per-category weight
+    mapping instead of a plain subject list. Scoring a batch of answer sets is then two
+    matrix products: answers -> category scores -> subject scores.
+    """
+
+    def __init__(self, questions, career_mapping):
+        self.categories = list(career_mapping)
+        for q in questions:
+            if q['category'] not in self.categories:
+                self.categories.append(q['category'])
+        category_index = {category: i for i, category in enumerate(self.categories)}
+
+        self.subjects = []
+        for subjects in career_mapping.values():
+            for subject in subjects:
+                if subject not in self.subjects:
+                    self.subjects.append(subject)
+        subject_index = {subject: i for i, subject in enumerate(self.subjects)}
+
+        self.question_weights = np.zeros((len(questions), len(self.categories)))
+        for row, q in enumerate(questions):
+            self.question_weights[row, category_index[q['category']]] = q.get('weight', 1.0)
+
+        self.subject_affinity = np.zeros((len(self.categories), len(self.subjects)))
+        for category, subjects in career_mapping.items():
+            weights = subjects if isinstance(subjects, dict) else dict.fromkeys(subjects, 1.0)
+            for subject, weight in weights.items():
+                self.subject_affinity[category_index[category], subject_index[subject]] = weight
+
+        # The best score each subject can reach, i.e. every answer 'Strongly Agree'
+        best_category_scores = max(RESPONSE_VALUES.values()) * np.maximum(self.question_weights, 0).sum(axis=0)
+        self.max_subject_scores = best_category_scores @ self.subject_affinity
+
+    @property
+    def n_questions(self):
+        return self.question_weights.shape[0]
+
+    def encode_answers(self, answers):
+        """
+        Turns one answer set into a vector of answer values in question order. Answers may
+        be response labels ('Agree', any letter case), values (-2..2) or the assessment's
+        {'answer': ...} dicts; unanswered questions count as neutral. Raises ValueError,
+        naming the question, for an answer that is neither.
+        """
+        vector = np.zeros(self.n_questions)
+        for i, answer in enumerate(answers[:self.n_questions]):
+            if isinstance(answer, dict):
+                answer = answer['answer']
+            try:
+                vector[i] = response_value(answer)
+            except ValueError as e:
+                raise ValueError(f"question {i + 1}: {e}") from None
+        return vector
+
+    def score_batch(self, answer_matrix):
+        """
+        Scores many answer sets at once. answer_matrix is (n_sets, n_questions) of answer
+        values. Returns (category_scores, subject_scores, confidence): only categories
+        scoring above zero contribute to subjects. confidence is each subject's score as a
+        fraction of the best score any subject could reach; the denominator is shared, so
+        confidence falls as the ranking does.
+        """
+        answer_matrix = np.atleast_2d(np.asarray(answer_matrix, dtype=np.float64))
+        category_scores = answer_matrix @ self.question_weights
+        subject_scores = np.maximum(category_scores, 0) @ self.subject_affinity
+        best_possible = self.max_subject_scores.max() if self.max_subject_scores.size else 0.0
+        confidence = subject_scores / best_possible if best_possible > 0 else np.zeros_like(subject_scores)
+        return category_scores, subject_scores, confidence
+
+    def rank_subjects(self, answers):
+        """
+        Scores one answer set and returns every subject with a positive score as
+        (subject, score, confidence), best first; ties keep career_mapping order.
+        """
+        _, subject_scores, confidence = self.score_batch(self.encode_answers(answers))
+        order = np.argsort(-subject_scores[0], kind='stable')
+        return [(self.subjects[i], float(subject_scores[0, i]), float(confidence[0, i]))
+                for i in order if subject_scores[0, i] > 0]
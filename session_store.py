@@ -0,0 +1,198 @@
+"""
+Optional server-side storage for the compact per-session state.
+
+With a store configured, each browser session carries an opaque id in its URL (?sid=...).
+The session's persisted keys (page, language, assessment answers and Finder selection
+bitmasks, a few hundred bytes of JSON) are written to the store after a rerun changes
+them, and restored when a session opens with that id. Students then keep their place
+across server restarts and when a load balancer moves them to another replica.
+
+The store is chosen by the GERBANG_SESSION_STORE environment variable:
+    sqlite:///.cache/sessions.sqlite3   a local SQLite file, shared by processes on one host
+    redis://localhost:6379/0            any Redis-compatible server (needs the redis package)
+Left unset, nothing is stored and sessions live in server memory only.
+"""
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+import metrics
+
+logger = logging.getLogger('gerbang_kampus.sessions')
+
+SESSION_STORE_ENV = 'GERBANG_SESSION_STORE'
+DEFAULT_SQLITE_PATH = os.path.join('.cache', 'sessions.sqlite3')
+# Sessions untouched for this long are dropped (7 days)
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+# The session state keys that are persisted; everything else is derived or transient
+PERSISTED_KEYS = ('page', 'language_code', 'assessment_answers', 'finder_filters')
+
+
+class SQLiteSessionStore:
+    """Session snapshots in a local SQLite file (WAL mode, so several worker processes can share it)."""
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def load(self, session_id):
+        """Returns the stored snapshot for session_id, or None if there is none or it expired."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT state, updated_at FROM sessions WHERE session_id = ?', (session_id,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return None
+        return json.loads(row[0])
+
+    def save(self, session_id, payload):
+        """Stores a snapshot already serialized by encode_snapshot()."""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sessions (session_id, state, updated_at) VALUES (?, ?, ?)',
+                (session_id, payload, time.time()),
+            )
+            self._conn.commit()
+
+    def prune(self):
+        """Deletes expired sessions."""
+        with self._lock:
+            self._conn.execute('DELETE FROM sessions WHERE updated_at < ?', (time.time() - self.ttl_seconds,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisSessionStore:
+    """
+    Session snapshots in a Redis-compatible server, expiring through the server's TTLs.
+    client is anything with Redis' get/set(ex=) commands: redis-py, or an in-process
+    stand-in such as fakeredis for development.
+    """
+
+    def __init__(self, client, prefix='gerbang:session:', ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.client = client
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(f"{SESSION_STORE_ENV}={url} needs the 'redis' package") from e
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def load(self, session_id):
+        payload = self.client.get(self.prefix + session_id)
+        return json.loads(payload) if payload is not None else None
+
+    def save(self, session_id, payload):
+        self.client.set(self.prefix + session_id, payload, ex=self.ttl_seconds)
+
+    def prune(self):
+        pass  # Keys expire on the server
+
+    def close(self):
+        self.client.close()
+
+
+def open_session_store(spec=None):
+    """Returns the store described by spec (default: $GERBANG_SESSION_STORE), or None if none is configured."""
+    spec = spec if spec is not None else os.environ.get(SESSION_STORE_ENV, '')
+    if not spec:
+        return None
+    if spec.startswith('sqlite:///'):
+        store = SQLiteSessionStore(spec[len('sqlite:///'):] or DEFAULT_SQLITE_PATH)
+        store.prune()
+        return store
+    if spec.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisSessionStore.from_url(spec)
+    raise ValueError(f"Unsupported {SESSION_STORE_ENV} value {spec!r}; use sqlite:///path or redis://host:port/db")
+
+
+def new_session_id():
+    return secrets.token_urlsafe(12)
+
+
+def encode_snapshot(session_state):
+    """Serializes the persisted keys of session_state as compact JSON."""
+    snapshot = {}
+    for key in PERSISTED_KEYS:
+        if key in session_state:
+            value = session_state[key]
+            snapshot[key] = list(value) if isinstance(value, (bytearray, bytes)) else value
+    return json.dumps(snapshot, separators=(',', ':'), sort_keys=True)
+
+
+def restore_snapshot(session_state, snapshot):
+    """Copies a loaded snapshot back into session_state."""
+    for key in PERSISTED_KEYS:
+        if key in snapshot:
+            value = snapshot[key]
+            session_state[key] = bytearray(value) if key == 'assessment_answers' else value
+
+
+def restore_session(store, session_state, query_params):
+    """
+    Attaches the session to its stored state on its first run: restores the snapshot
+    for the URL's session id, or gives a new session an id. A failing store only costs
+    persistence, never the page.
+    """
+    if 'session_id' in session_state:
+        return
+    session_id = query_params.get('sid')
+    try:
+        snapshot = store.load(session_id) if session_id else None
+    except Exception:
+        logger.exception('Loading session %s failed', session_id)
+        metrics.inc('session_store_errors_total', operation='load')
+        snapshot = None
+    if snapshot is not None:
+        restore_snapshot(session_state, snapshot)
+        metrics.inc('session_restores_total')
+    elif not session_id:
+        session_id = new_session_id()
+        query_params['sid'] = session_id
+    session_state['session_id'] = session_id
+
+
+def save_session(store, session_state):
+    """Writes the session's snapshot to the store if it changed since the last save."""
+    session_id = session_state.get('session_id')
+    if session_id is None:
+        return
+    payload = encode_snapshot(session_state)
+    saved_hash = hash(payload)
+    if session_state.get('session_saved_hash') == saved_hash:
+        return
+    try:
+        store.save(session_id, payload)
+    except Exception:
+        logger.exception('Saving session %s failed', session_id)
+        metrics.inc('session_store_errors_total', operation='save')
+        return
+    session_state['session_saved_hash'] = saved_hash
+    metrics.inc('session_saves_total')
+    metrics.inc('session_saved_bytes_total', len(payload))
@@ -0,0 +1,78 @@
+"""The batch_assess command line, end to end on the bundled data."""
+import csv
+import json
+import os
+import sys
+
+import pytest
+
+import batch_assess
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+N_QUESTIONS = 20
+
+
+def run_cli(monkeypatch, tmp_path, input_path, output_name, *options):
+    output_path = tmp_path / output_name
+    monkeypatch.setattr(sys, 'argv', [
+        'batch_assess.py', str(input_path), str(output_path), '--workers', '1', '--chunk-size', '2',
+        '--universities', os.path.join(DATA_DIR, 'universities.csv'),
+        '--questions', os.path.join(DATA_DIR, 'assessment_questions.json'),
+        '--updates', str(tmp_path / 'updates'), *options,
+    ])
+    batch_assess.main()
+    return output_path
+
+
+@pytest.fixture
+def answers_jsonl(tmp_path):
+    lines = [
+        json.dumps({'student_id': 'a', 'answers': ['Strongly Agree'] * N_QUESTIONS}),
+        '{bad json',
+        json.dumps({'student_id': 'b', 'answers': ['agree'] * (N_QUESTIONS - 1) + ['Maybe']}),
+        json.dumps(['not', 'an', 'object']),
+        '',
+        json.dumps({'student_id': 'c', 'answers': [2, -1, 0, 1] * (N_QUESTIONS // 4)}),
+    ]
+    path = tmp_path / 'answers.jsonl'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return path
+
+
+def test_bad_rows_become_error_rows(monkeypatch, tmp_path, answers_jsonl):
+    output_path = run_cli(monkeypatch, tmp_path, answers_jsonl, 'results.jsonl', '--top-universities', '10')
+    results = [json.loads(line) for line in output_path.read_text(encoding='utf-8').splitlines()]
+
+    assert [r['student_id'] for r in results] == ['a', '2', 'b', '4', 'c']
+    errors = {r['student_id']: r.get('error') for r in results}
+    assert errors['a'] is None and errors['c'] is None
+    assert errors['2'].startswith('line 2: invalid JSON')
+    assert errors['4'] == 'line 4: expected a JSON object'
+    assert errors['b'].startswith(f'question {N_QUESTIONS}')
+    for result in results:
+        if result.get('error'):
+            assert result['recommendations'] == []
+
+    recommended = results[0]['recommendations']
+    assert len(recommended) == 2
+    assert all(len(reco['universities']) == 10 for reco in recommended)
+
+
+def test_csv_output_honours_top_options(monkeypatch, tmp_path):
+    input_path = tmp_path / 'answers.csv'
+    with open(input_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['student_id'] + [f'q{i}' for i in range(1, N_QUESTIONS + 1)])
+        writer.writerow(['x'] + ['Agree'] * N_QUESTIONS)
+        writer.writerow(['y'] + ['7'] * N_QUESTIONS)
+
+    output_path = run_cli(monkeypatch, tmp_path, input_path, 'results.csv',
+                          '--top-subjects', '3', '--top-universities', '4')
+    with open(output_path, encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+
+    x_rows = [row for row in rows if row['student_id'] == 'x']
+    assert [row['position'] for row in x_rows] == ['1', '2', '3']
+    assert all(len(row['top_universities'].split('; ')) == 4 and not row['error'] for row in x_rows)
+    (y_row,) = [row for row in rows if row['student_id'] == 'y']
+    assert y_row['error'].startswith('question 1')
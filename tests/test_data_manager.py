@@ -0,0 +1,144 @@
+"""Incremental delta reloads must index exactly what a full rebuild would."""
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import metrics
+from data_manager import DataManager
+from finder_index import UniversityIndex
+from finder_search import SearchIndex
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+QUERIES = ['engineering', 'ecole', 'zoology', 'harvrd', 'asia', 'mit', 'law school', 'univ']
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    shutil.copy(os.path.join(DATA_DIR, 'universities.csv'), tmp_path)
+    shutil.copy(os.path.join(DATA_DIR, 'assessment_questions.json'), tmp_path)
+    (tmp_path / 'updates').mkdir()
+    return tmp_path
+
+
+def make_manager(data_dir):
+    return DataManager(
+        str(data_dir / 'universities.csv'), str(data_dir / 'assessment_questions.json'),
+        str(data_dir / 'updates'), str(data_dir / 'universities.arrow'),
+    )
+
+
+@pytest.fixture
+def manager(data_dir):
+    return make_manager(data_dir)
+
+
+def base_universities(data_dir):
+    return pd.read_csv(data_dir / 'universities.csv', encoding='latin-1', dtype=str, keep_default_na=False)['University']
+
+
+def write_delta(manager, name):
+    """Writes a delta that changes, removes and adds one university each."""
+    base = pd.read_csv(manager.csv_path, encoding='latin-1', dtype=str, keep_default_na=False)
+    changed = base.iloc[0].copy()
+    changed['Subject'] = 'Engineering; Zoology'
+    changed['Rank'] = '7'
+    changed['Action'] = 'change'
+    removed = base.iloc[5][['University']].copy()
+    removed['Action'] = 'remove'
+    added = base.iloc[3].copy()
+    added['University'] = '\xc9cole Nouvelle de Test'
+    added['Rank'] = '2'
+    added['Continent'] = 'Antarctica'
+    added['Action'] = 'add'
+
+    os.makedirs(manager.updates_dir, exist_ok=True)
+    pd.DataFrame([changed, removed, added]).to_csv(
+        os.path.join(manager.updates_dir, name), index=False, encoding='latin-1')
+    return base.iloc[5]['University']
+
+
+def delta_reload_count():
+    return sum(timer['count'] for timer in metrics.REGISTRY.snapshot()['timers']
+               if timer['name'] == 'data_reload_seconds' and timer['labels'] == {'kind': 'delta'})
+
+
+def assert_matches_full_rebuild(version):
+    """Checks the version's incrementally built indexes against ones rebuilt from its table."""
+    finder_index = UniversityIndex(version.uni_df)
+    assert version.finder_index.continents == finder_index.continents
+    assert version.finder_index.subjects == finder_index.subjects
+    assert version.finder_index.levels == finder_index.levels
+    assert version.finder_index.vocabulary_key == finder_index.vocabulary_key
+    for subject, rows in finder_index.subject_postings.items():
+        np.testing.assert_array_equal(np.sort(version.finder_index.subject_postings[subject]), np.sort(rows))
+
+    selections = [
+        (finder_index.continents, [], []),
+        (finder_index.continents, finder_index.subjects[:4], ['PhD']),
+        (['Antarctica'], ['Engineering'], []),
+        (finder_index.continents, ['Zoology'], []),
+    ]
+    for continents, subjects, levels in selections:
+        np.testing.assert_array_equal(
+            version.finder_index.filter(continents, subjects, levels),
+            finder_index.filter(continents, subjects, levels),
+        )
+    ranges = {'Rank': (1, 50)}
+    np.testing.assert_array_equal(
+        version.finder_index.filter(finder_index.continents, ranges=ranges),
+        finder_index.filter(finder_index.continents, ranges=ranges),
+    )
+
+    search_index = SearchIndex(version.uni_df)
+    assert version.search_index.vocabulary == search_index.vocabulary
+    for query in QUERIES:
+        np.testing.assert_array_equal(version.search_index.search(query), search_index.search(query), err_msg=query)
+
+
+def test_delta_reload_matches_a_full_rebuild(manager):
+    before = manager.current
+    delta_reloads = delta_reload_count()
+    removed_name = write_delta(manager, '001.csv')
+    assert manager.refresh()
+    assert delta_reload_count() == delta_reloads + 1
+    version = manager.current
+    assert version.number == before.number + 1
+    assert manager.last_error is None
+    assert removed_name not in set(version.uni_df['University'])
+    assert '\xc9cole Nouvelle de Test' in set(version.uni_df['University'])
+    assert len(version.search_index.search('zoology')) >= 1
+    assert_matches_full_rebuild(version)
+
+    # Sessions pinned to the previous version keep it
+    assert manager.get(before.number) is before
+
+
+def test_remove_only_delta(data_dir):
+    names = base_universities(data_dir)
+    (data_dir / 'updates' / '001.csv').write_text(f'Action,University\nremove,{names[0]}\n', encoding='latin-1')
+
+    # Applied on the first load...
+    manager = make_manager(data_dir)
+    assert manager.last_error is None
+    assert len(manager.current.uni_df) == len(names) - 1
+    assert names[0] not in set(manager.current.uni_df['University'])
+
+    # ...and incrementally
+    (data_dir / 'updates' / '002.csv').write_text(f'Action,University\nremove,{names[1]}\n', encoding='latin-1')
+    assert manager.refresh()
+    assert len(manager.current.uni_df) == len(names) - 2
+    assert names[1] not in set(manager.current.uni_df['University'])
+    assert_matches_full_rebuild(manager.current)
+
+
+def test_bad_delta_is_skipped(data_dir):
+    names = base_universities(data_dir)
+    (data_dir / 'updates' / '001.csv').write_text('Action,University\nexplode,Nowhere\n', encoding='latin-1')
+    (data_dir / 'updates' / '002.csv').write_text(f'Action,University\nremove,{names[0]}\n', encoding='latin-1')
+
+    manager = make_manager(data_dir)
+    assert manager.current.error is None
+    assert len(manager.current.uni_df) == len(names) - 1
@@ -0,0 +1,40 @@
+"""SearchIndex result caching."""
+import pandas as pd
+
+from finder_search import SearchIndex
+
+
+def make_index(**kwargs):
+    df = pd.DataFrame({
+        'University': ['Harvard University', 'Stanford University', 'University of Oxford'],
+        'Continent': ['North America', 'North America', 'Europe'],
+        'Subject': ['Law; Medicine', 'Engineering', 'Law; History'],
+        'Level': ['PhD', 'Masters', 'Bachelors'],
+    })
+    return SearchIndex(df, **kwargs)
+
+
+def test_complete_results_are_cached():
+    index = make_index()
+    result = index.search('harvrd')
+    assert result.tolist() == [0]
+    assert index.search('Harvrd') is result
+
+
+def test_results_cut_short_by_the_budget_are_not_cached():
+    index = make_index(budget_ms=0)
+    assert index.search('harvrd').tolist() == []
+    assert not index._cache
+    # Exact and prefix matches never depend on the budget
+    assert index.search('stan').tolist() == [1]
+    assert 'stan' in index._cache
+
+
+def test_cache_is_bounded_by_bytes():
+    index = make_index(cache_bytes=16)
+    index.search('law')
+    index.search('university')
+    assert list(index._cache) == ['law']
+    index.search('oxford')
+    assert index._cache_size <= 16
+    assert list(index._cache) == ['oxford']
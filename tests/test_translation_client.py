@@ -0,0 +1,144 @@
+"""TranslatorClient retries, Retry-After handling and circuit breaker, against the fake translator."""
+import time
+
+import pytest
+
+import utils
+from fake_translator import start_fake_translator
+from translation_client import CircuitBreaker, TranslationError, TranslationUnavailable, TranslatorClient
+
+
+@pytest.fixture
+def fake_translator():
+    servers = []
+
+    def start(**kwargs):
+        server, url = start_fake_translator(**kwargs)
+        servers.append(server)
+        return server, url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def make_client(url, **kwargs):
+    kwargs.setdefault('backoff_base', 0.01)
+    kwargs.setdefault('backoff_max', 0.5)
+    return TranslatorClient('key', url, 'region', **kwargs)
+
+
+def test_translates_in_input_order(fake_translator):
+    server, url = fake_translator()
+    client = make_client(url)
+    assert client.translate(['Home', 'About'], 'id') == ['[id] Home', '[id] About']
+    assert server.request_count == 1
+
+
+def test_retries_after_a_short_retry_after(fake_translator):
+    server, url = fake_translator(fail_first=2, fail_status=429, retry_after=0.05)
+    client = make_client(url)
+    assert client.translate(['Home'], 'id') == ['[id] Home']
+    assert server.request_count == 3
+
+
+def test_long_retry_after_fails_fast_and_holds_the_circuit_open(fake_translator):
+    server, url = fake_translator(fail_first=1, fail_status=429, retry_after=60)
+    client = make_client(url, breaker=CircuitBreaker(threshold=5, reset_seconds=0.1))
+
+    started = time.monotonic()
+    with pytest.raises(TranslationError) as excinfo:
+        client.translate(['Home'], 'id')
+    assert time.monotonic() - started < 2
+    assert excinfo.value.status_code == 429
+    assert server.request_count == 1
+
+    # Held open for the Retry-After, not just reset_seconds: no request goes out
+    time.sleep(0.2)
+    with pytest.raises(TranslationUnavailable):
+        client.translate(['Home'], 'id')
+    assert server.request_count == 1
+
+
+def test_non_retryable_status_is_not_retried(fake_translator):
+    server, url = fake_translator(fail_first=1, fail_status=401)
+    with pytest.raises(TranslationError) as excinfo:
+        make_client(url).translate(['Home'], 'id')
+    assert excinfo.value.status_code == 401
+    assert server.request_count == 1
+
+
+def test_time_budget_bounds_a_slow_service(fake_translator):
+    server, url = fake_translator(delay=1.0)
+    client = make_client(url, timeout=(1, 5), time_budget=0.3)
+    started = time.monotonic()
+    with pytest.raises(TranslationError):
+        client.translate(['Home'], 'id')
+    assert time.monotonic() - started < 1.0
+
+
+def test_breaker_opens_after_repeated_failures_and_recovers_half_open(fake_translator):
+    server, url = fake_translator(fail_first=2, fail_status=503)
+    client = make_client(url, max_retries=0, breaker=CircuitBreaker(threshold=2, reset_seconds=0.2))
+
+    for _ in range(2):
+        with pytest.raises(TranslationError):
+            client.translate(['Home'], 'id')
+    assert client.breaker.is_open
+    with pytest.raises(TranslationUnavailable):
+        client.translate(['Home'], 'id')
+    assert server.request_count == 2
+
+    # After reset_seconds one trial call goes through, and its success closes the circuit
+    time.sleep(0.25)
+    assert client.translate(['Home'], 'id') == ['[id] Home']
+    assert not client.breaker.is_open
+    assert client.translate(['About'], 'id') == ['[id] About']
+    assert server.request_count == 4
+
+
+def test_failed_half_open_trial_reopens_the_circuit():
+    breaker = CircuitBreaker(threshold=1, reset_seconds=0.1)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.15)
+    assert breaker.allow()
+    # Only one trial at a time
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.is_open and not breaker.allow()
+
+
+def test_translate_batch_does_not_cache_failures(fake_translator, monkeypatch):
+    server, url = fake_translator(fail_first=1, fail_status=503)
+    client = make_client(url, max_retries=0)
+    monkeypatch.setattr(utils, 'get_translation_client', lambda *args: client)
+
+    cache = {}
+    assert utils.translate_batch(['Home', 'About'], 'id', cache, 'key', url, 'region') == {'Home': 'Home', 'About': 'About'}
+    assert cache == {}
+
+    # The English fallback was not cached, so the next call asks again and caches the real translations
+    assert utils.translate_batch(['Home', 'About'], 'id', cache, 'key', url, 'region') == {
+        'Home': '[id] Home', 'About': '[id] About',
+    }
+    assert cache == {('Home', 'id'): '[id] Home', ('About', 'id'): '[id] About'}
+    assert server.request_count == 2
+
+
+def test_translate_batch_sends_chunks_concurrently_and_keeps_order(fake_translator, monkeypatch):
+    server, url = fake_translator(fail_first=1, fail_status=401)
+    client = make_client(url)
+    monkeypatch.setattr(utils, 'get_translation_client', lambda *args: client)
+    monkeypatch.setattr(utils, 'MAX_BATCH_ITEMS', 2)
+
+    texts = ['a', 'b', 'c', 'd', 'e']
+    cache = {}
+    translations = utils.translate_batch(texts, 'id', cache, 'key', url, 'region')
+    assert server.request_count == 3
+    # One chunk failed for good; the others are still translated and cached
+    assert sum(translation == f'[id] {text}' for text, translation in translations.items()) in (3, 4)
+    assert all(translation in (text, f'[id] {text}') for text, translation in translations.items())
+    assert len(cache) == sum(translation != text for text, translation in translations.items())
@@ -0,0 +1,25 @@
+"""TranslationStore pruning of the SQLite file shared by worker processes."""
+from translation_store import TranslationStore
+
+
+def test_prune_keeps_other_model_versions_unless_asked(tmp_path):
+    path = str(tmp_path / 'translations.sqlite3')
+    old = TranslationStore(path, model_version='old')
+    new = TranslationStore(path, model_version='new')
+    old[('Home', 'id')] = 'Beranda'
+    new[('Home', 'id')] = 'Halaman Utama'
+
+    # What every process does at startup: a rollout's old and new workers keep each other's rows
+    assert new.prune() == 0
+    assert old.prune() == 0
+    assert TranslationStore(path, model_version='old').get(('Home', 'id')) == 'Beranda'
+
+    assert new.prune(other_models=True) == 1
+    assert TranslationStore(path, model_version='old').get(('Home', 'id')) is None
+    assert TranslationStore(path, model_version='new').get(('Home', 'id')) == 'Halaman Utama'
+
+
+def test_prune_deletes_expired_entries(tmp_path):
+    store = TranslationStore(str(tmp_path / 'translations.sqlite3'), ttl_seconds=0)
+    store[('Home', 'id')] = 'Beranda'
+    assert store.prune() == 1
@@ -0,0 +1,238 @@
+import asyncio
+import email.utils
+import random
+import threading
+import time
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+# (connect, read) timeouts in seconds for a single /translate request
+DEFAULT_TIMEOUT = (3.05, 10)
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 8.0
+# Total time one translate() call may spend on requests and backoff, since it runs on the script thread
+DEFAULT_TIME_BUDGET = 15.0
+# Consecutive failed requests that open the circuit, and how long it stays open
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_RESET_SECONDS = 30.0
+# Throttling and server-side errors are worth retrying; anything else (401, 400...) is not
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class TranslationError(Exception):
+    """A translation request failed; the caller should fall back to the original text."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TranslationUnavailable(TranslationError):
+    """The circuit breaker is open, so no request was made."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls for `reset_seconds`
+    (or longer, when hold_open() is told the service asked for a longer pause). After
+    that a single trial call is let through: success closes the circuit again, failure
+    reopens it.
+    """
+
+    def __init__(self, threshold=DEFAULT_BREAKER_THRESHOLD, reset_seconds=DEFAULT_BREAKER_RESET_SECONDS):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._open_until = None  # time.monotonic() deadline while open
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self._open_until is not None and time.monotonic() < self._open_until
+
+    def allow(self):
+        """Returns whether a call may go ahead now."""
+        with self._lock:
+            if self._open_until is None:
+                return True
+            if time.monotonic() < self._open_until or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._open_until = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.threshold:
+                self._open_until = time.monotonic() + self.reset_seconds
+            self._trial_in_flight = False
+
+    def hold_open(self, seconds):
+        """Opens the circuit for at least `seconds`, e.g. for a long Retry-After."""
+        with self._lock:
+            self._open_until = max(self._open_until or 0.0, time.monotonic() + max(seconds, self.reset_seconds))
+            self._trial_in_flight = False
+
+
+def _retry_after_seconds(response):
+    """Parses a Retry-After header given in seconds or as an HTTP date, or returns None."""
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _error_message(response):
+    try:
+        return response.json().get('error', {}).get('message', 'Unknown HTTP Error')
+    except ValueError:
+        return response.text
+
+
+class TranslatorClient:
+    """
+    Azure Translator client that keeps a pool of keep-alive connections.
+
+    Requests have connect/read timeouts, retryable failures are retried with full-jitter
+    exponential backoff (waiting at least as long as any Retry-After header asks), and a
+    circuit breaker stops calling the service after repeated failures. No single wait is
+    longer than backoff_max and one translate() call never runs past time_budget seconds:
+    if the service asks for a longer pause than that, the call fails at once and the
+    circuit is held open for the requested time instead.
+    """
+
+    def __init__(self, azure_key, azure_endpoint, azure_region, timeout=DEFAULT_TIMEOUT,
+                 max_retries=DEFAULT_MAX_RETRIES, backoff_base=DEFAULT_BACKOFF_BASE,
+                 backoff_max=DEFAULT_BACKOFF_MAX, time_budget=DEFAULT_TIME_BUDGET, breaker=None, pool_size=10):
+        self.url = azure_endpoint.rstrip('/') + '/translate'
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.time_budget = time_budget
+        self.breaker = breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Ocp-Apim-Subscription-Key': azure_key,
+            'Ocp-Apim-Subscription-Region': azure_region,
+            'Content-type': 'application/json',
+        })
+
+    def _backoff(self, attempt, retry_after=None):
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After, capped at backoff_max."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return min(delay, self.backoff_max)
+
+    def translate(self, texts, to_language):
+        """
+        Translates texts (one /translate request's worth) and returns them in input order.
+        Raises TranslationUnavailable while the circuit is open and TranslationError once
+        the request has failed for good.
+        """
+        if not self.breaker.allow():
+            metrics.inc('translation_circuit_rejections_total')
+            raise TranslationUnavailable('Translation service is temporarily unavailable.')
+
+        params = {'api-version': '3.0', 'to': [to_language]}
+        body = [{'text': text} for text in texts]
+        deadline = time.monotonic() + self.time_budget
+        attempt = 0
+        while True:
+            response = None
+            started = time.perf_counter()
+            # The read timeout shrinks to whatever is left of the call's time budget
+            connect_timeout, read_timeout = self.timeout
+            timeout = (connect_timeout, max(0.1, min(read_timeout, deadline - time.monotonic())))
+            try:
+                response = self.session.post(self.url, params=params, json=body, timeout=timeout,
+                                             headers={'X-ClientTraceId': str(uuid.uuid4())})
+                metrics.observe('translation_request_seconds', time.perf_counter() - started)
+                metrics.inc('translation_requests_total', status=response.status_code)
+                metrics.inc('translation_bytes_sent_total', len(response.request.body or b''))
+                metrics.inc('translation_bytes_received_total', len(response.content))
+                if response.status_code < 400:
+                    translations = [item['translations'][0]['text'] for item in response.json()]
+                    self.breaker.record_success()
+                    return translations
+                error = TranslationError(f"(HTTP {response.status_code}) {_error_message(response)}", response.status_code)
+                retryable = response.status_code in RETRYABLE_STATUS
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                metrics.inc('translation_requests_total', status='network_error')
+                error = TranslationError(f"Could not reach the translation service: {e}")
+                retryable = True
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                error = TranslationError(f"Unexpected response from the translation service: {e}")
+                retryable = False
+
+            if not retryable or attempt >= self.max_retries:
+                self.breaker.record_failure()
+                raise error
+
+            remaining = deadline - time.monotonic()
+            retry_after = _retry_after_seconds(response)
+            if retry_after is not None and retry_after > min(self.backoff_max, remaining):
+                # Waiting that long would block the script thread; stop calling until then instead
+                metrics.inc('translation_retry_after_holds_total')
+                self.breaker.hold_open(retry_after)
+                raise error
+            delay = self._backoff(attempt, retry_after)
+            if delay >= remaining:
+                self.breaker.record_failure()
+                raise error
+            metrics.inc('translation_retries_total')
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncTranslatorClient:
+    """
+    asyncio front end for TranslatorClient, for issuing many requests concurrently.
+
+    Each request runs on a worker thread over the shared connection pool; `concurrency`
+    caps how many are in flight at once.
+    """
+
+    def __init__(self, client, concurrency=4):
+        self.client = client
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def translate(self, texts, to_language):
+        async with self._semaphore:
+            return await asyncio.to_thread(self.client.translate, texts, to_language)
+
+    async def translate_chunks(self, chunks, to_language, return_exceptions=False):
+        """
+        Translates several request-sized chunks concurrently; results keep chunk order.
+        With return_exceptions, a failed chunk's exception is returned in its place.
+        """
+        return await asyncio.gather(*(self.translate(chunk, to_language) for chunk in chunks),
+                                    return_exceptions=return_exceptions)
@@ -0,0 +1,194 @@
+"""
+Translation cache backed by a SQLite file that every worker process shares.
+
+Entries of other model versions are left alone at startup, since during a rollout old
+and new processes share the file. Once no process uses an old version any more, clear
+it out with:
+    python translation_store.py --other-models
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Default location of the on-disk translation store, shared by every worker process
+DEFAULT_STORE_PATH = os.path.join('.cache', 'translations.sqlite3')
+# Translator model/version the cached entries belong to; bump it to invalidate old translations
+DEFAULT_MODEL_VERSION = 'azure-v3-general'
+# How many translations are kept in process memory before least-recently-used ones are evicted
+DEFAULT_MAX_ENTRIES = 50000
+# How long a translation is trusted before it is fetched again (30 days)
+DEFAULT_TTL_SECONDS = 30 * 24 * 60 * 60
+
+
+class TranslationStore:
+    """
+    A bounded translation cache backed by SQLite.
+
+    Entries are keyed by (text, language) like the old dict cache, scoped to a model
+    version. Recent entries live in an in-memory LRU; every write also goes to the
+    SQLite file, which runs in WAL mode so several worker processes can read it at once.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH, model_version=DEFAULT_MODEL_VERSION,
+                 max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.model_version = model_version
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory = OrderedDict()  # (text, language) -> (translation, created_at)
+        self._packs = {}  # language -> {text: translation}, never evicted or expired
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS translations (
+                text TEXT NOT NULL,
+                language TEXT NOT NULL,
+                model TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (text, language, model)
+            )
+        """)
+        self._conn.commit()
+
+    def _expired(self, created_at):
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def _remember(self, key, translation, created_at):
+        """Puts an entry in the in-memory LRU, evicting the oldest entries past the bound."""
+        self._memory[key] = (translation, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def add_pack(self, language, translations):
+        """Registers a prebuilt language pack; its entries are served without touching disk."""
+        with self._lock:
+            self._packs.setdefault(language, {}).update(translations)
+
+    def _lookup(self, key):
+        """Returns the cached translation for key, or None. Misses fall through to disk."""
+        pack = self._packs.get(key[1])
+        if pack is not None and key[0] in pack:
+            return pack[key[0]]
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[1]):
+                    self._memory.move_to_end(key)
+                    return entry[0]
+                del self._memory[key]
+
+            row = self._conn.execute(
+                'SELECT translation, created_at FROM translations WHERE text = ? AND language = ? AND model = ?',
+                (key[0], key[1], self.model_version)
+            ).fetchone()
+            if row is None or self._expired(row[1]):
+                return None
+            self._remember(key, row[0], row[1])
+            return row[0]
+
+    def __contains__(self, key):
+        return self._lookup(key) is not None
+
+    def __getitem__(self, key):
+        translation = self._lookup(key)
+        if translation is None:
+            raise KeyError(key)
+        return translation
+
+    def get(self, key, default=None):
+        translation = self._lookup(key)
+        return default if translation is None else translation
+
+    def __setitem__(self, key, translation):
+        self.update({key: translation})
+
+    def update(self, entries):
+        """Stores many (text, language) -> translation entries in one transaction."""
+        now = time.time()
+        rows = [(text, language, self.model_version, translation, now)
+                for (text, language), translation in dict(entries).items()]
+        with self._lock:
+            for key, translation in dict(entries).items():
+                self._remember(key, translation, now)
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO translations (text, language, model, translation, created_at) VALUES (?, ?, ?, ?, ?)',
+                    rows
+                )
+
+    def __len__(self):
+        return len(self._memory) + sum(len(pack) for pack in self._packs.values())
+
+    def warm_start(self, languages=None):
+        """
+        Loads the most recent unexpired translations from disk into memory, up to the
+        LRU bound. Call this at boot so the first user on each language hits the cache.
+        """
+        query = 'SELECT text, language, translation, created_at FROM translations WHERE model = ?'
+        params = [self.model_version]
+        if self.ttl_seconds is not None:
+            query += ' AND created_at >= ?'
+            params.append(time.time() - self.ttl_seconds)
+        if languages:
+            query += f" AND language IN ({','.join('?' * len(languages))})"
+            params.extend(languages)
+        query += ' ORDER BY created_at DESC LIMIT ?'
+        params.append(self.max_entries)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+            # Insert oldest first so the newest entries end up most recently used
+            for text, language, translation, created_at in reversed(rows):
+                self._remember((text, language), translation, created_at)
+        return len(rows)
+
+    def prune(self, other_models=False):
+        """
+        Deletes expired entries from disk and returns how many went. other_models=True also
+        deletes every other model version's entries; only do that once no process still
+        serves them, e.g. from the command line after a rollout.
+        """
+        deleted = 0
+        with self._lock, self._conn:
+            if other_models:
+                cursor = self._conn.execute('DELETE FROM translations WHERE model != ?', (self.model_version,))
+                deleted += cursor.rowcount
+            if self.ttl_seconds is not None:
+                cursor = self._conn.execute(
+                    'DELETE FROM translations WHERE created_at < ?', (time.time() - self.ttl_seconds,)
+                )
+                deleted += cursor.rowcount
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prune the shared translation store.')
+    parser.add_argument('--path', default=DEFAULT_STORE_PATH)
+    parser.add_argument('--model-version', default=DEFAULT_MODEL_VERSION, help='The model version to keep.')
+    parser.add_argument('--other-models', action='store_true',
+                        help='Also delete the entries of every other model version.')
+    args = parser.parse_args()
+
+    store = TranslationStore(args.path, args.model_version)
+    deleted = store.prune(other_models=args.other_models)
+    store.close()
+    print(f'Deleted {deleted} translations from {args.path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,118 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-
-@st.cache_data
-def convert_df_to_csv(df_to_convert):
-    """Converts a DataFrame to a CSV string for download."""
-    return df_to_convert.to_csv(index=False).encode('utf-8')
-
-def show_page(T, df):
+import time
+from collections import Counter
+
+import metrics
+from finder_export import EXPORT_FORMATS, export_results, get_export_cache
+
+UI_STRINGS = [
+    'University Finder', 'University data could not be loaded.', 'Filter Options', 'Continent',
+    'Subject', 'Degree Level', 'Search by University Name, Subject, or Continent',
+    'e.g., Harvard, Engineering, Asia', 'Showing', 'results', 'Download results', 'Export format', 'Rank',
+    'Visit Website', 'Available Subjects', 'Degree Levels', 'More Information', 'Email',
+    'Application Opens', 'Tuition Range (USD)', 'Subject Expertise',
+    'No universities found for the selected criteria. Try adjusting your filters.',
+    'Results per page', 'Previous', 'Next', 'Page', 'of',
+    'Tuition (USD per year)', 'Rank Range', 'Application Opens Between', 'Sort by',
+    'Relevance', 'Tuition: low to high', 'Tuition: high to low',
+    'Application opens: earliest', 'Application opens: latest',
+]
+
+# Sort choice -> (typed column, descending) keys, most significant first; rank breaks ties
+SORT_OPTIONS = {
+    'Relevance': [],
+    'Rank': [('Rank', False)],
+    'Tuition: low to high': [('Tuition_Min_USD', False), ('Rank', False)],
+    'Tuition: high to low': [('Tuition_Max_USD', True), ('Rank', False)],
+    'Application opens: earliest': [('Application_Open_Date', False), ('Rank', False)],
+    'Application opens: latest': [('Application_Open_Date', True), ('Rank', False)],
+}
+
+# Choices for how many result cards are rendered at once
+PAGE_SIZE_OPTIONS = [10, 25, 50]
+
+def page_strings(index):
+    """Returns every string the Finder passes through T(), including the filter labels taken from the data."""
+    return UI_STRINGS + index.continents + index.subjects + index.levels
+
+def _filter_state(index):
+    """
+    Returns the session's Finder selections as [vocabulary key, continent mask, subject
+    mask, level mask]: bit i of a mask is set when entry i of that (sorted) vocabulary is
+    selected. Selections made over other vocabularies (after a data update) start over.
+    """
+    filters = st.session_state.get('finder_filters')
+    if filters is None or filters[0] != index.vocabulary_key:
+        # Every continent selected, no subject or level filter
+        filters = [index.vocabulary_key, (1 << len(index.continents)) - 1, 0, 0]
+        st.session_state.finder_filters = filters
+    return filters
+
+def _toggle_filter(slot, bit):
+    """Checkbox callback: flips one entry of a selection bitmask."""
+    st.session_state.finder_filters[slot] ^= 1 << bit
+
+def _filter_checkboxes(T, vocabulary, filters, slot):
+    """
+    Renders a checkbox per vocabulary entry from the selection bitmask in filters[slot]
+    and returns the selected entries. The checkboxes have no keys, so the bitmask is the
+    session's only copy of the selection.
+    """
+    labels = [T(term) for term in vocabulary]
+    label_counts = Counter(labels)
+    selected = []
+    for bit, (term, label) in enumerate(zip(vocabulary, labels)):
+        checked = bool(filters[slot] >> bit & 1)
+        if label_counts[label] > 1:
+            label = f"{label} ({term})"  # Two entries translated alike still need distinct widgets
+        st.sidebar.checkbox(label, value=checked, on_change=_toggle_filter, args=(slot, bit))
+        if checked:
+            selected.append(term)
+    return selected
+
+def _change_page(step):
+    """Button callback that moves the Finder's result page forwards or backwards."""
+    st.session_state.finder_page += step
+
+def _range_sliders(T, index):
+    """
+    Renders the tuition, rank and application date sliders and returns the active ranges
+    as {typed column: (low, high)}. A slider left at its full extent does not filter, so
+    rows with a missing value stay visible until the user narrows it.
+    """
+    ranges = {}
+
+    tuition_min_bounds, tuition_max_bounds = index.bounds('Tuition_Min_USD'), index.bounds('Tuition_Max_USD')
+    if tuition_min_bounds and tuition_max_bounds and tuition_min_bounds[0] < tuition_max_bounds[1]:
+        low, high = int(tuition_min_bounds[0]), int(tuition_max_bounds[1])
+        st.sidebar.subheader(T("Tuition (USD per year)"))
+        budget = st.sidebar.slider(T("Tuition (USD per year)"), low, high, (low, high), step=500, key='tuition_range', label_visibility='collapsed')
+        if budget != (low, high):
+            # Programmes whose tuition range overlaps the budget
+            ranges['Tuition_Min_USD'] = (None, budget[1])
+            ranges['Tuition_Max_USD'] = (budget[0], None)
+
+    rank_bounds = index.bounds('Rank')
+    if rank_bounds is not None and rank_bounds[0] < rank_bounds[1]:
+        low, high = int(rank_bounds[0]), int(rank_bounds[1])
+        st.sidebar.subheader(T("Rank Range"))
+        rank_range = st.sidebar.slider(T("Rank Range"), low, high, (low, high), key='rank_range', label_visibility='collapsed')
+        if rank_range != (low, high):
+            ranges['Rank'] = rank_range
+
+    date_bounds = index.bounds('Application_Open_Date')
+    if date_bounds is not None and date_bounds[0] < date_bounds[1]:
+        low, high = pd.Timestamp(date_bounds[0]).date(), pd.Timestamp(date_bounds[1]).date()
+        st.sidebar.subheader(T("Application Opens Between"))
+        date_range = st.sidebar.slider(T("Application Opens Between"), low, high, (low, high), key='open_date_range', label_visibility='collapsed')
+        if date_range != (low, high):
+            ranges['Application_Open_Date'] = (np.datetime64(date_range[0]), np.datetime64(date_range[1]))
+
+    return ranges
+
+def show_page(T, df, index, search_index, data_version=''):
     """
     Renders the University Finder page with dynamic checkbox filters.
     """
@@ -19,76 +125,86 @@ def show_page(T, df):
     # --- SIDEBAR FILTERS (Using Checkboxes) ---
     st.sidebar.header(T("Filter Options"))
 
+    filters = _filter_state(index)
+
     # Continent Checkboxes
     st.sidebar.subheader(T("Continent"))
-    continents_english = sorted(df['Continent'].unique())
-    # Use a session state to remember filter selections
-    if 'selected_continents' not in st.session_state:
-        st.session_state.selected_continents = continents_english[:] # Default to all selected
-    
-    selected_continents = []
-    for continent in continents_english:
-        if st.sidebar.checkbox(T(continent), value=(continent in st.session_state.selected_continents), key=f"continent_{continent}"):
-            selected_continents.append(continent)
-    st.session_state.selected_continents = selected_continents
-
+    selected_continents = _filter_checkboxes(T, index.continents, filters, 1)
 
     # Subject Checkboxes
     st.sidebar.subheader(T("Subject"))
-    all_subjects_english = sorted(list(set(subject.strip() for sublist in df['Subject'].str.split(';') for subject in sublist if subject)))
-    selected_subjects = [subject for subject in all_subjects_english if st.sidebar.checkbox(T(subject), value=False, key=f"subject_{subject}")]
+    selected_subjects = _filter_checkboxes(T, index.subjects, filters, 2)
 
     # Level Checkboxes
     st.sidebar.subheader(T("Degree Level"))
-    all_levels_english = sorted(list(set(level.strip() for levellist in df['Level'].str.split(';') for level in levellist if level)))
-    selected_levels = [level for level in all_levels_english if st.sidebar.checkbox(T(level), value=False, key=f"level_{level}")]
+    selected_levels = _filter_checkboxes(T, index.levels, filters, 3)
+
+    # Range Sliders
+    selected_ranges = _range_sliders(T, index)
 
     # --- MAIN CONTENT AREA ---
-    search_query = st.text_input(T("Search by University Name, Subject, or Continent"), placeholder=T("e.g., Harvard, Engineering, Asia"))
+    search_cols = st.columns([3, 1])
+    search_query = search_cols[0].text_input(T("Search by University Name, Subject, or Continent"), placeholder=T("e.g., Harvard, Engineering, Asia"))
+    sort_labels = [T(option) for option in SORT_OPTIONS]
+    sort_label = search_cols[1].selectbox(T("Sort by"), sort_labels, key='finder_sort')
+    sort_choice = list(SORT_OPTIONS)[sort_labels.index(sort_label)]
 
     # --- FILTERING LOGIC ---
-    filtered_df = df.copy()
+    # Checkbox filters are exact matches resolved against the load-time index;
+    # no continents selected means nothing is shown.
+    with metrics.timed('finder_stage_seconds', stage='filter'):
+        positions = index.filter(selected_continents, selected_subjects, selected_levels, selected_ranges)
 
-    # General search query logic
+    # General search query logic: ranked, typo-tolerant matches, best first
     if search_query:
-        filtered_df = filtered_df[
-            filtered_df['University'].str.contains(search_query, case=False, na=False) |
-            filtered_df['Subject'].str.contains(search_query, case=False, na=False) |
-            filtered_df['Continent'].str.contains(search_query, case=False, na=False)
-        ]
-
-    # Checkbox filter logic
-    if selected_continents:
-        filtered_df = filtered_df[filtered_df['Continent'].isin(selected_continents)]
-    else:
-        # If no continents are selected, show nothing
-        filtered_df = pd.DataFrame(columns=df.columns)
+        with metrics.timed('finder_stage_seconds', stage='search'):
+            ranked = search_index.search(search_query)
+            positions = ranked[np.isin(ranked, positions)]
 
-    if selected_subjects:
-        # Create a regex pattern to match any of the selected subjects
-        subject_pattern = '|'.join(selected_subjects)
-        filtered_df = filtered_df[filtered_df['Subject'].str.contains(subject_pattern, case=False, na=False)]
-
-    if selected_levels:
-        # Create a regex pattern to match any of the selected levels
-        level_pattern = '|'.join(selected_levels)
-        filtered_df = filtered_df[filtered_df['Level'].str.contains(level_pattern, case=False, na=False)]
+    # Without a search, 'Relevance' is the catalogue order, i.e. by rank
+    with metrics.timed('finder_stage_seconds', stage='sort'):
+        positions = index.sort(positions, SORT_OPTIONS[sort_choice])
+    metrics.inc('finder_results_total', len(positions))
 
     # --- DISPLAY RESULTS ---
     st.write("---")
-    st.write(f"**{T('Showing')} {len(filtered_df)} {T('results')}**")
+    st.write(f"**{T('Showing')} {len(positions)} {T('results')}**")
 
-    if not filtered_df.empty:
+    if len(positions):
         # --- DOWNLOAD BUTTON ---
-        st.download_button(
-           label=T("Download results as CSV"),
-           data=convert_df_to_csv(filtered_df),
-           file_name='gerbang_kampus_universities.csv',
-           mime='text/csv',
-        )
+        # The file is built from the filtered row positions only when the button is clicked
+        export_cols = st.columns([1, 3])
+        export_format = export_cols[0].selectbox(T("Export format"), list(EXPORT_FORMATS), key='finder_export_format')
+        extension, mime = EXPORT_FORMATS[export_format]
+        export_cache = get_export_cache()
+        with export_cols[1]:
+            st.download_button(
+               label=T("Download results"),
+               data=lambda: export_results(export_cache, df, positions, export_format, data_version),
+               file_name=f'gerbang_kampus_universities.{extension}',
+               mime=mime,
+            )
         
+        # --- PAGINATION ---
+        # Only the rows on the current page are turned into widgets; the count and the
+        # download above always cover the full filtered set.
+        page_size = st.selectbox(T("Results per page"), PAGE_SIZE_OPTIONS, key='finder_page_size')
+        page_count = (len(positions) + page_size - 1) // page_size
+
+        # Go back to the first page whenever the filters or the page size change
+        # Kept as a hash, which is all the comparison needs
+        filter_signature = hash((tuple(filters), tuple(sorted(selected_ranges.items())), search_query, sort_choice, page_size))
+        if st.session_state.get('finder_filter_signature') != filter_signature:
+            st.session_state.finder_filter_signature = filter_signature
+            st.session_state.finder_page = 0
+        st.session_state.finder_page = min(st.session_state.finder_page, page_count - 1)
+
+        page_start = st.session_state.finder_page * page_size
+        page_df = df.iloc[positions[page_start:page_start + page_size]]
+
         # Display each university in a bordered container
-        for index, row in filtered_df.iterrows():
+        render_started = time.perf_counter()
+        for _, row in page_df.iterrows():
             with st.container(border=True):
                 col1, col2 = st.columns([3, 1])
                 with col1:
@@ -105,5 +221,12 @@ def show_page(T, df):
                     st.write(f"**{T('Application Opens')}:** {row['Application_Open']}")
                     st.write(f"**{T('Tuition Range (USD)')}:** {row['Tuition_USD_Range']}")
                     st.write(f"**{T('Subject Expertise')}:** {row['Subject_Expertise']}")
+        metrics.observe('finder_stage_seconds', time.perf_counter() - render_started, stage='render')
+
+        if page_count > 1:
+            nav_cols = st.columns([1, 2, 1])
+            nav_cols[0].button(f"← {T('Previous')}", on_click=_change_page, args=(-1,), disabled=st.session_state.finder_page == 0, use_container_width=True)
+            nav_cols[1].markdown(f"<p style='text-align: center;'>{T('Page')} {st.session_state.finder_page + 1} {T('of')} {page_count}</p>", unsafe_allow_html=True)
+            nav_cols[2].button(f"{T('Next')} →", on_click=_change_page, args=(1,), disabled=st.session_state.finder_page >= page_count - 1, use_container_width=True)
     else:
         st.warning(T("No universities found for the selected criteria. Try adjusting your filters."))
@@ -1,79 +1,135 @@
 import streamlit as st
-import requests
-import uuid
+import asyncio
 import json
+import os
 
-@st.cache_data
+import metrics
+from translation_client import AsyncTranslatorClient, TranslationError, TranslationUnavailable, TranslatorClient
+from translation_store import TranslationStore
+
+# Azure Translator v3 accepts at most 1000 array elements and 50,000 characters
+# (across all elements) in a single /translate request.
+MAX_BATCH_ITEMS = 1000
+MAX_BATCH_CHARS = 50000
+
+# Prebuilt per-language packs written by build_language_packs.py
+LANGUAGE_PACK_DIR = os.path.join('data', 'lang_packs')
+
+def load_language_packs(directory=LANGUAGE_PACK_DIR):
+    """Returns {language: {text: translation}} for every pack found in directory."""
+    packs = {}
+    if not os.path.isdir(directory):
+        return packs
+    for filename in sorted(os.listdir(directory)):
+        language, ext = os.path.splitext(filename)
+        if ext == '.json':
+            with open(os.path.join(directory, filename), 'r', encoding='utf-8') as f:
+                packs[language] = json.load(f)
+    return packs
+
+@st.cache_resource
 def get_translation_cache():
-    """Initializes and returns a session-specific cache for translations."""
-    return {}
+    """
+    Returns the process-wide translation store, seeded with the prebuilt language packs and
+    warm-started from the shared SQLite file so translations survive restarts and are shared
+    between worker processes.
+    """
+    store = TranslationStore()
+    for language, translations in load_language_packs().items():
+        store.add_pack(language, translations)
+    store.prune()
+    store.warm_start()
+    return store
+
+def _credentials_ok(azure_key, azure_endpoint, azure_region):
+    """Checks the Azure credentials, warning the user when translation is disabled."""
+    if not all([azure_key, azure_endpoint, azure_region]):
+        st.warning("Azure credentials (key, endpoint, or region) are not set. Translation is disabled.")
+        return False
+    if "PASTE_YOUR" in azure_key or "PASTE_YOUR" in azure_region:
+        st.warning("Azure credentials appear to be placeholders. Please update them. Translation is disabled.")
+        return False
+    return True
+
+def _chunk_texts(texts):
+    """Splits texts into chunks that fit inside a single /translate request."""
+    chunk, chunk_chars = [], 0
+    for text in texts:
+        if chunk and (len(chunk) >= MAX_BATCH_ITEMS or chunk_chars + len(text) > MAX_BATCH_CHARS):
+            yield chunk
+            chunk, chunk_chars = [], 0
+        chunk.append(text)
+        chunk_chars += len(text)
+    if chunk:
+        yield chunk
+
+@st.cache_resource
+def get_translation_client(azure_key: str, azure_endpoint: str, azure_region: str):
+    """Returns the process-wide pooled translation client for these credentials."""
+    return TranslatorClient(azure_key, azure_endpoint, azure_region)
+
+def _translate_chunks(client, chunks, to_language):
+    """
+    Sends every chunk, concurrently when there are several. Returns one entry per chunk:
+    the list of translations, or the TranslationError that request ended with.
+    """
+    if len(chunks) == 1:
+        try:
+            return [client.translate(chunks[0], to_language)]
+        except Exception as e:
+            return [e]
+
+    async def send_all():
+        return await AsyncTranslatorClient(client).translate_chunks(chunks, to_language, return_exceptions=True)
+    return asyncio.run(send_all())
+
+def translate_batch(texts, to_language: str, cache: dict, azure_key: str, azure_endpoint: str, azure_region: str):
+    """
+    Translates many strings with as few /translate calls as the API limits allow.
+
+    Strings already in the cache are skipped, so calling this with every string a
+    page needs before rendering turns the page's T() calls into cache lookups.
+    Returns a dict mapping each input string to its translation.
+    """
+    if to_language == "en":
+        return {text: text for text in texts}
+
+    # Deduplicate while keeping order, and only send what the cache is missing
+    unique_texts = [text for text in dict.fromkeys(texts) if text]
+    pending = [text for text in unique_texts if (text, to_language) not in cache]
+    metrics.inc('translation_cache_hits_total', len(unique_texts) - len(pending), language=to_language)
+    metrics.inc('translation_cache_misses_total', len(pending), language=to_language)
+
+    if pending and _credentials_ok(azure_key, azure_endpoint, azure_region):
+        client = get_translation_client(azure_key, azure_endpoint, azure_region)
+        chunks = list(_chunk_texts(pending))
+        for chunk, result in zip(chunks, _translate_chunks(client, chunks, to_language)):
+            if isinstance(result, TranslationUnavailable):
+                # The service is down; show English for now without asking again on every string
+                continue
+            if isinstance(result, TranslationError):
+                st.error(f"Translation failed: {result}. Please double-check your Azure Key, Endpoint, AND Region.")
+                continue
+            if isinstance(result, Exception):
+                st.error(f"An unexpected error occurred during translation: {result}.")
+                continue
+            # Only real translations are cached; failures fall back to English uncached
+            cache.update({(text, to_language): translation for text, translation in zip(chunk, result)})
+
+    return {text: cache.get((text, to_language), text) if text else text for text in texts}
 
 def translate_text(text: str, to_language: str, cache: dict, azure_key: str, azure_endpoint: str, azure_region: str):
     """
-    Translates text using a direct Azure REST API call to ensure headers are set correctly.
+    Translates text, serving it from the cache when possible and otherwise through the
+    pooled Azure client. Falls back to the original text if translation fails.
     """
     if to_language == "en" or not text:
         return text
 
     cache_key = (text, to_language)
-    if cache_key in cache:
-        return cache[cache_key]
-
-    try:
-        # Check if all required credentials are provided
-        if not all([azure_key, azure_endpoint, azure_region]):
-            st.warning("Azure credentials (key, endpoint, or region) are not set. Translation is disabled.")
-            return text
-        if "PASTE_YOUR" in azure_key or "PASTE_YOUR" in azure_region:
-             st.warning("Azure credentials appear to be placeholders. Please update them. Translation is disabled.")
-             return text
-
-
-        # Construct the full URL for the REST API request
-        path = '/translate'
-        constructed_url = azure_endpoint.rstrip('/') + path
-
-        # Set the required parameters for the API call
-        params = {
-            'api-version': '3.0',
-            'to': [to_language]
-        }
-        
-        # Set the required headers, including the key and now the region
-        headers = {
-            'Ocp-Apim-Subscription-Key': azure_key,
-            'Ocp-Apim-Subscription-Region': azure_region,
-            'Content-type': 'application/json',
-            'X-ClientTraceId': str(uuid.uuid4())
-        }
-        
-        # The body of the request containing the text to translate
-        body = [{'text': text}]
-
-        # Make the API call using the 'requests' library
-        response = requests.post(constructed_url, params=params, headers=headers, json=body)
-        response.raise_for_status()  # This will raise an error for bad status codes (like 401)
-
-        # Process the successful JSON response
-        response_json = response.json()
-        translation = response_json[0]['translations'][0]['text']
-        
-        cache[cache_key] = translation
-        return translation
-        
-    except requests.exceptions.HTTPError as http_err:
-        # Provide a much more detailed error message if authentication fails
-        error_content = "Could not parse error response."
-        try:
-            error_content = http_err.response.json()
-            error_message = error_content.get('error', {}).get('message', 'Unknown HTTP Error')
-        except json.JSONDecodeError:
-             error_message = http_err.response.text
+    cached = cache.get(cache_key)
+    if cached is not None:
+        metrics.inc('translation_cache_hits_total', language=to_language)
+        return cached
 
-        st.error(f"Translation failed: (HTTP {http_err.response.status_code}) {error_message}. Please double-check your Azure Key, Endpoint, AND Region.")
-        cache[cache_key] = text
-        return text
-    except Exception as e:
-        st.error(f"An unexpected error occurred during translation: {e}.")
-        cache[cache_key] = text
-        return text
+    return translate_batch([text], to_language, cache, azure_key, azure_endpoint, azure_region)[text]